@@ -1,100 +0,0 @@
-import pybaseball.utils
-from .playerid_lookup import playerid_reverse_lookup
-from .playerid_lookup import player_search_list
-from .playerid_lookup import playerid_lookup
-from .playerid_lookup import chadwick_register
-from .teamid_lookup import fangraphs_teams
-from .teamid_lookup import team_ids
-from .statcast import statcast, statcast_single_game
-from .statcast_pitcher import (
-	statcast_pitcher,
-	statcast_pitcher_exitvelo_barrels,
-	statcast_pitcher_expected_stats,
-	statcast_pitcher_pitch_arsenal,
-	statcast_pitcher_arsenal_stats,
-	statcast_pitcher_percentile_ranks,
-	statcast_pitcher_spin_dir_comp
-)
-from .statcast_batter import (
-	statcast_batter,
-	statcast_batter_exitvelo_barrels,
-	statcast_batter_expected_stats,
-	statcast_batter_percentile_ranks,
-	statcast_batter_pitch_arsenal
-)
-from .statcast_running import statcast_sprint_speed, statcast_running_splits
-from .statcast_fielding import (
-	statcast_outs_above_average,
-	statcast_outfield_directional_oaa,
-	statcast_outfield_catch_prob,
-	statcast_outfielder_jump,
-	statcast_catcher_poptime,
-	statcast_catcher_framing
-)
-from .league_batting_stats import batting_stats_bref
-from .league_batting_stats import batting_stats_range
-from .league_batting_stats import bwar_bat
-from .league_pitching_stats import pitching_stats_bref
-from .league_pitching_stats import pitching_stats_range
-from .league_pitching_stats import bwar_pitch
-from .standings import standings
-from .team_results import schedule_and_record
-from .pitching_leaders import pitching_stats
-from .batting_leaders import batting_stats
-from .fielding_leaders import fielding_stats
-from .team_batting import team_batting
-from .team_batting import team_batting_bref
-from .team_fielding import team_fielding
-from .team_fielding import team_fielding_bref
-from .team_pitching import team_pitching
-from .team_pitching import team_pitching_bref
-from .top_prospects import top_prospects
-from .amateur_draft import amateur_draft
-from .amateur_draft_by_team import amateur_draft_by_team
-from .lahman import parks
-from .lahman import all_star_full
-from .lahman import appearances
-from .lahman import awards_managers
-from .lahman import awards_players
-from .lahman import awards_share_managers
-from .lahman import awards_share_players
-from .lahman import batting
-from .lahman import batting_post
-from .lahman import college_playing
-from .lahman import fielding
-from .lahman import fielding_of
-from .lahman import fielding_of_split
-from .lahman import fielding_post
-from .lahman import hall_of_fame
-from .lahman import home_games
-from .lahman import managers
-from .lahman import managers_half
-from .lahman import master
-from .lahman import people
-from .lahman import pitching
-from .lahman import pitching_post
-from .lahman import salaries
-from .lahman import schools
-from .lahman import series_post
-from .lahman import teams_core
-from .lahman import teams_upstream
-from .lahman import teams_franchises
-from .lahman import teams_half
-from .lahman import download_lahman
-from .retrosheet import season_game_logs
-from .retrosheet import world_series_logs
-from .retrosheet import all_star_game_logs
-from .retrosheet import wild_card_logs
-from .retrosheet import division_series_logs
-from .retrosheet import lcs_logs
-from .retrosheet import schedules
-from .retrosheet import park_codes
-from .retrosheet import rosters
-from .retrosheet import events
-from .team_game_logs import team_game_logs
-from .plotting import plot_stadium
-from .plotting import spraychart
-from .datasources.fangraphs import (fg_batting_data, fg_pitching_data, fg_team_batting_data, fg_team_fielding_data,
-                                    fg_team_pitching_data)
-from .split_stats import get_splits
-from .version import __version__
@@ -11,7 +11,8 @@ historical MLB data, including batting, pitching, fielding, and standings metric
 Workflow:
 1. Data Acquisition:
     - Fetches current game data from a proprietary API to identify games scheduled for today.
-    - Retrieves historical baseball statistics from the pybaseball module for the current year.
+    - Retrieves historical baseball statistics from the pybaseball module for the current season, and optionally
+      for previous seasons, which are cached permanently once finished.
 
 2. Data Preprocessing:
     - Columns of the dataframes are prefixed to differentiate data types (e.g., batting, pitching).
@@ -30,7 +31,15 @@ Workflow:
     - Predictions are printed in the console in a human-readable format.
     - An email template is constructed with the predictions.
     - The email is sent to a predefined recipient with the predictions and model evaluation metrics.
-    - The predictions are also saved in a JSON file for future reference.
+    - The predictions and the fetched odds are appended to a SQLite history for evaluating past picks.
+
+Execution:
+    The steps above are declared as pipeline stages with their dependencies (see modules/pipeline.py).
+    Independent stages, such as the API call, the pybaseball fetch and the logo loading, run concurrently,
+    and a failed stage reports which downstream stages were skipped.
+
+    With DAEMON_MODE=1, the application then keeps polling the odds (see modules/daemon.py) and sends the
+    email again whenever a recommendation moves materially.
 
 Note:
     Exception handling mechanisms are in place to manage potential issues during the execution. 
@@ -38,71 +47,200 @@ Note:
 """
 
 # Standard library imports
-import json
-import pandas as pd
+import os
+
+# External library imports
+from dotenv import load_dotenv
 
 # Modules imports
-from modules.constants import team_to_id
-from modules.data_fetching import fetch_data_from_api, fetch_data_from_pybaseball, year
-from modules.data_processing import get_games_playing_today, load_and_preprocess_data, prefix_columns
+from modules.constants import team_to_id, search_strategy, search_time_budget_seconds, training_mode, \
+    training_seasons, daemon_poll_seconds, table_prefixes
+from modules.data_fetching import fetch_data_from_api, fetch_training_seasons
+from modules.data_processing import build_slate, get_games_playing_today, load_and_preprocess_data, \
+    load_projected_tables, table_columns
 from modules.model import train_and_test_model, parse_data
-from modules.recommendation import format_output
-from modules.email_utils import create_email_template, send_email
+from modules.recommendation import format_output, get_recommendation_cache_stats
+from modules.email_utils import create_email_template, create_plaintext_body, send_email
+from modules.assets import load_logos, refresh_logos_in_background
+from modules.pipeline import Stage, run_pipeline
+from modules.instrumentation import format_summary, write_run_report
+from modules.importance import compute_feature_importance, format_importance
+from modules.history import record_recommendations, record_odds_snapshot
+from modules.daemon import run_daemon
+
+# Load .env once, before any stage reads its settings. Stages run concurrently, so relying on the first
+# stage that happens to load it would race with the others.
+load_dotenv()
+
+
+def load_logos_stage(inputs):
+    """Load the bookmaker logos used in the email."""
+    # Load the cached bookmaker logos and refresh stale ones while the pipeline runs
+    logos = load_logos()
+    refresh_logos_in_background()
+    return logos
+
+
+def fetch_odds_stage(inputs):
+    """Fetch the current betting lines from The Odds API."""
+    print("Fetching data from API...")
+    return fetch_data_from_api()
+
+
+def build_slate_stage(inputs):
+    """Index the fetched games by local game date."""
+    # Index the games by local date once
+    return build_slate(inputs['odds'])
+
+
+def todays_teams_stage(inputs):
+    """Get the IDs of the teams playing today."""
+    print("Getting today's games...")
+    return get_games_playing_today(inputs['slate'], team_to_id)
+
+
+def fetch_stats_stage(inputs):
+    """Fetch the team statistics of the training seasons from pybaseball, projected to the model's columns."""
+    print("Fetching data from pybaseball...")
+    seasons = int(os.getenv("TRAINING_SEASONS") or training_seasons)
+    season = os.getenv("SEASON")
+    # Only the model's columns are read from the cache, and the wide tables are not kept past this stage
+    season_tables = fetch_training_seasons(
+        seasons, int(season) if season else None, refresh=os.getenv("REFRESH_STATS") == "1",
+        columns={table: table_columns(prefix) for table, prefix in table_prefixes.items()})
+    return {season: load_projected_tables(*tables) for season, tables in season_tables.items()}
+
+
+def preprocess_stage(inputs):
+    """Align and split the projected team statistics."""
+    season_tables = dict(inputs['stats'])
+    # The latest season fetched is the one today's features come from
+    batting_data, pitching_data, fielding_data, standings_data = season_tables.pop(max(season_tables))
+
+    print("Loading and preprocessing data...")
+    return load_and_preprocess_data(inputs['todays_teams'], batting_data, pitching_data, fielding_data, standings_data,
+                                    past_seasons=season_tables)
+
+
+def train_stage(inputs):
+    """Train and evaluate the model."""
+    train_data, test_data = inputs['preprocess'][:2]
+
+    print("Training and testing the model...")
+    time_budget = os.getenv("SEARCH_TIME_BUDGET")
+    return train_and_test_model(
+        train_data, test_data, strategy=os.getenv("SEARCH_STRATEGY", search_strategy),
+        time_budget=float(time_budget) if time_budget else search_time_budget_seconds,
+        mode=os.getenv("TRAINING_MODE", training_mode))
+
+
+def predict_stage(inputs):
+    """Generate recommendations for today's games."""
+    best_grid = inputs['train'][0]
+    feature_matrix = inputs['preprocess'][2]
+
+    print("Parsing data...")
+    games = parse_data(inputs['slate'], best_grid, feature_matrix, team_to_id)
+
+    # Print recommendations in a formatted manner
+    for game in games:
+        recommendation = game.get('recommendation')
+        if recommendation:
+            print(format_output(recommendation))
+
+    return games
+
+
+def render_stage(inputs):
+    """Render the HTML and plaintext email bodies."""
+    games = inputs['predict']
+    _, mae, mse, r2, _ = inputs['train']
+
+    print("Creating email template...")
+    email_body = create_email_template(games, mae, mse, r2, logos=inputs['logos'])
+    text_body = create_plaintext_body(games, mae, mse, r2)
+    return email_body, text_body
+
+
+def send_stage(inputs):
+    """Send the recommendation email."""
+    email_body, text_body = inputs['render']
+
+    print("Sending email...")
+    send_email(email_body, text_body, logos=inputs['logos'])
+
+
+def importance_stage(inputs):
+    """Compute the permutation importance of the model's features."""
+    model, _, _, _, X_test = inputs['train']
+    test_data = inputs['preprocess'][1]
+
+    importances = compute_feature_importance(
+        model, X_test, test_data['W-L%'], getattr(model, 'fingerprint_', None))
+    print("Most important features:\n" + format_importance(importances))
+    return importances
+
+
+def snapshot_stage(inputs):
+    """Append the fetched odds to the history."""
+    games = [game for slate_games in inputs['slate'].values() for game in slate_games]
+    return record_odds_snapshot(games)
+
+
+def save_stage(inputs):
+    """Append the recommendations to the history."""
+    model = inputs['train'][0]
+    count = record_recommendations(inputs['predict'], getattr(model, 'fingerprint_', None))
+    print(f"Recorded {count} recommendations in the history")
+    return count
+
+
+def build_stages():
+    """Declare the stages of the application and the stages each one depends on."""
+    stages = [
+        Stage('logos', load_logos_stage),
+        Stage('odds', fetch_odds_stage),
+        Stage('stats', fetch_stats_stage),
+        Stage('slate', build_slate_stage, deps=['odds']),
+        Stage('todays_teams', todays_teams_stage, deps=['slate']),
+        Stage('preprocess', preprocess_stage, deps=['stats', 'todays_teams']),
+        Stage('train', train_stage, deps=['preprocess'], cpu_bound=True),
+        Stage('predict', predict_stage, deps=['train', 'preprocess', 'slate']),
+        Stage('render', render_stage, deps=['predict', 'train', 'logos']),
+        Stage('send', send_stage, deps=['render', 'logos']),
+        Stage('snapshot', snapshot_stage, deps=['slate']),
+        Stage('save', save_stage, deps=['predict', 'train']),
+    ]
+
+    # Feature importance is optional and does not block the email. The toggle is read when the stages are
+    # built, after .env has been loaded.
+    if os.getenv("FEATURE_IMPORTANCE") == "1":
+        stages.append(Stage('importance', importance_stage, deps=['train', 'preprocess'], cpu_bound=True))
+
+    return stages
+
 
 # Main function
 if __name__ == "__main__":
     try:
-        # Fetch data from API
-        print("Fetching data from API...")
-        api_data = fetch_data_from_api()
-        
-        # Get today's games
-        print("Getting today's games...")
-        games_playing_today_ids = get_games_playing_today(api_data, team_to_id)
-
-        # Fetch data from pybaseball
-        print("Fetching data from pybaseball...")
-        batting_data, pitching_data, fielding_data, standings_data = fetch_data_from_pybaseball(
-            year)
-
-        # Prefix the columns
-        batting_data = prefix_columns(batting_data, 'bat_')
-        pitching_data = prefix_columns(pitching_data, 'pit_')
-        fielding_data = prefix_columns(fielding_data, 'field_')
-        standings_data = prefix_columns(standings_data, 'stand_')
-
-        # Load and preprocess the data
-        print("Loading and preprocessing data...")
-        train_data, test_data = load_and_preprocess_data(games_playing_today_ids, batting_data, pitching_data, fielding_data, standings_data)
-
-        # Train and test the model
-        print("Training and testing the model...")
-        best_grid, mae, mse, r2, X_test = train_and_test_model(
-            train_data, test_data)
-
-        # Parse the data
-        print("Parsing data...")
-        games = parse_data(api_data, best_grid, train_data, team_to_id)
-
-        # Print recommendations in a formatted manner
-        for game in games:
-            recommendation = game.get('recommendation')
-            if recommendation:
-                print(format_output(recommendation))
-
-        # Create email template
-        print("Creating email template...")
-        email_body = create_email_template(games)
-
-        # Send email
-        print("Sending email...")
-        send_email(mae, mse, r2, email_body)
-
-        print("Done!")
-
-        # Save the games data as a JSON file 'data.json'
-        with open('data/data.json', 'w') as f:
-            json.dump(games, f, default=str)
+        results, failures, skipped = run_pipeline(build_stages())
+        if not failures:
+            print("Done!")
+
+        # Report where the run's time and memory went
+        print(format_summary())
+        write_run_report(extra={
+            'failed': {name: f"{type(error).__name__}: {error}" for name, error in failures.items()},
+            'skipped': skipped,
+            'feature_importance': results.get('importance'),
+            'recommendation_cache': get_recommendation_cache_stats(),
+        })
+
+        # Keep the model in memory and follow the lines until the end of the day
+        if os.getenv("DAEMON_MODE") == "1" and not failures:
+            model, mae, mse, r2, _ = results['train']
+            run_daemon(model, results['preprocess'][2], (mae, mse, r2), results['slate'], results['predict'],
+                       logos=results['logos'], interval=float(os.getenv("DAEMON_POLL_SECONDS") or daemon_poll_seconds))
 
     # Handle exceptions
     except Exception as e:
@@ -0,0 +1,207 @@
+"""
+run.py
+------
+
+This script times each stage of the MLB betting pipeline in isolation on synthetic inputs and writes the
+results as JSON. Passing a previous results file as a baseline turns the run into a regression check.
+
+Usage:
+    python -m benchmarks.run --games 15 --bookmakers 3 --markets 1 --output bench_results.json
+    python -m benchmarks.run --baseline bench_results.json --tolerance 0.25
+
+Functions:
+- time_stage: Time a stage over several runs.
+- run_benchmarks: Time every pipeline stage on synthetic inputs.
+- compare_to_baseline: Find stages that got slower than a baseline allows.
+- main: Parse the command line, run the benchmarks and write the results.
+
+Imports:
+- Standard libraries: io, sys, json, time, argparse, statistics, contextlib, datetime
+- External libraries: pytz, modules, benchmarks.synthetic
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+import statistics
+from contextlib import redirect_stdout
+from datetime import datetime
+import pytz
+from modules.constants import team_to_id, slate_timezone
+from modules.data_processing import build_slate, get_games_playing_today, load_and_preprocess_data, \
+    load_projected_tables, build_odds_table
+from modules.model import train_and_test_model, parse_data
+from modules.recommendation import clear_recommendation_cache
+from modules.email_utils import create_email_template, create_plaintext_body
+from benchmarks.synthetic import make_odds_payload, make_team_tables
+
+
+def time_stage(func, repeat):
+    """
+    Time a stage over several runs.
+
+    Console output of the stage is suppressed while it is timed.
+
+    Args:
+    - func (callable): Stage to run, called without arguments.
+    - repeat (int): Number of runs.
+
+    Returns:
+    - tuple: Timing summary with median, min and max seconds, and the result of the last run.
+    """
+
+    durations = []
+    result = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            durations.append(time.perf_counter() - start)
+
+    summary = {
+        'median_seconds': statistics.median(durations),
+        'min_seconds': min(durations),
+        'max_seconds': max(durations),
+        'runs': repeat,
+    }
+    return summary, result
+
+
+def run_benchmarks(n_games=15, n_bookmakers=3, n_markets=1, repeat=5, strategy='random', n_iter=5, seed=0):
+    """
+    Time every pipeline stage on synthetic inputs.
+
+    Args:
+    - n_games (int): Number of games on the synthetic slate.
+    - n_bookmakers (int): Number of bookmakers quoting each game.
+    - n_markets (int): Number of markets per bookmaker.
+    - repeat (int): Number of runs per stage. Training runs once per repeat as well.
+    - strategy (str): Hyperparameter search strategy used for the training stage.
+    - n_iter (int): Number of candidates for the 'random' strategy.
+    - seed (int): Random seed for the synthetic data.
+
+    Returns:
+    - dict: Mapping of stage names to timing summaries.
+    """
+
+    # Every stage looks at the same slate date, even if the run crosses midnight
+    game_date = datetime.now(pytz.timezone(slate_timezone)).date()
+    api_data = make_odds_payload(n_games, n_bookmakers, n_markets, seed, game_date)
+    tables = make_team_tables(seed)
+    results = {}
+
+    results['build_slate'], slate = time_stage(lambda: build_slate(api_data), repeat)
+    results['get_games_playing_today'], team_ids = time_stage(
+        lambda: get_games_playing_today(slate, team_to_id, game_date), repeat)
+
+    def preprocess():
+        return load_and_preprocess_data(team_ids, *load_projected_tables(*tables))
+
+    results['load_and_preprocess_data'], (train_data, test_data, feature_matrix) = time_stage(preprocess, repeat)
+
+    results['train_and_test_model'], (model, mae, mse, r2, _) = time_stage(
+        lambda: train_and_test_model(train_data.copy(), test_data.copy(), use_store=False,
+                                     strategy=strategy, n_iter=n_iter), repeat)
+
+    results['build_odds_table'], _ = time_stage(lambda: build_odds_table(api_data), repeat)
+
+    def predict():
+        # Time the uncached path; repeated runs would otherwise be served from the recommendation cache
+        clear_recommendation_cache()
+        return parse_data(slate, model, feature_matrix, team_to_id, game_date)
+
+    results['parse_data'], games = time_stage(predict, repeat)
+
+    logos = {"FanDuel": b"png", "DraftKings": b"png", "Barstool Sportsbook": b"png"}
+    results['create_email_template'], _ = time_stage(
+        lambda: create_email_template(games, mae, mse, r2, logos=logos), repeat)
+    results['create_plaintext_body'], _ = time_stage(
+        lambda: create_plaintext_body(games, mae, mse, r2), repeat)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_seconds=0.001):
+    """
+    Find stages that got slower than a baseline allows.
+
+    Args:
+    - results (dict): Stage timings from run_benchmarks.
+    - baseline (dict): Stage timings from a previous run.
+    - tolerance (float): Allowed relative increase of the median time.
+    - min_seconds (float): Stages faster than this in both runs are ignored as noise.
+
+    Returns:
+    - list: Descriptions of the stages that regressed.
+    """
+
+    regressions = []
+    for stage, timing in results.items():
+        if stage not in baseline:
+            continue
+        current = timing['median_seconds']
+        previous = baseline[stage]['median_seconds']
+        if max(current, previous) < min_seconds:
+            continue
+        if current > previous * (1 + tolerance):
+            regressions.append(f"{stage}: {previous:.4f}s -> {current:.4f}s (+{(current / previous - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    """
+    Parse the command line, run the benchmarks and write the results.
+
+    Args:
+    - argv (list): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+    - int: Exit code, 1 if a stage regressed against the baseline.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the MLB betting pipeline on synthetic data.")
+    parser.add_argument('--games', type=int, default=15)
+    parser.add_argument('--bookmakers', type=int, default=3)
+    parser.add_argument('--markets', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--strategy', default='random', choices=['grid', 'random', 'halving'])
+    parser.add_argument('--n-iter', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="Previous results file to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative slowdown of a stage's median time.")
+    args = parser.parse_args(argv)
+
+    stages = run_benchmarks(args.games, args.bookmakers, args.markets, args.repeat, args.strategy, args.n_iter,
+                            args.seed)
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'params': {'games': args.games, 'bookmakers': args.bookmakers, 'markets': args.markets,
+                   'repeat': args.repeat, 'strategy': args.strategy, 'n_iter': args.n_iter, 'seed': args.seed},
+        'stages': stages,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    for stage, timing in stages.items():
+        print(f"{stage:<26} median {timing['median_seconds'] * 1000:>10.2f}ms  min {timing['min_seconds'] * 1000:>10.2f}ms")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('params') != report['params']:
+            print("Warning: the baseline was run with different parameters")
+        regressions = compare_to_baseline(stages, baseline['stages'], args.tolerance)
+        if regressions:
+            print("Regressions:\n" + "\n".join(regressions))
+            return 1
+        print("No regressions against the baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+synthetic.py
+------------
+
+This module generates synthetic inputs for the benchmark suite, so every pipeline stage can be timed offline.
+
+Functions:
+- make_odds_payload: Generate an Odds API payload with N games, M bookmakers and K markets.
+- make_team_tables: Generate pybaseball-shaped batting, pitching, fielding and standings tables.
+
+Imports:
+- Standard libraries: datetime
+- External libraries: numpy, pandas, pytz, modules.constants
+"""
+
+from datetime import datetime, time, timedelta
+import numpy as np
+import pandas as pd
+import pytz
+from modules.constants import features, team_to_id, team_abbrev_to_id, team_names_only, slate_timezone
+
+# Markets beyond h2h only add quotes to the payload; the pipeline prices the h2h market
+extra_markets = ['spreads', 'totals', 'h2h_lay', 'alternate_spreads', 'alternate_totals']
+
+
+def _american_price(rng):
+    """Draw a random American price between -300 and +300."""
+    price = int(rng.integers(100, 300))
+    return price if rng.random() < 0.5 else -price
+
+
+def make_odds_payload(n_games=15, n_bookmakers=3, n_markets=1, seed=0, game_date=None):
+    """
+    Generate an Odds API payload with N games, M bookmakers and K markets.
+
+    Games start every 15 minutes from 13:05 local time on the slate date, so they land on that date's slate
+    whatever the time of day. Team pairs repeat once all 30 teams have been used.
+
+    Args:
+    - n_games (int): Number of games.
+    - n_bookmakers (int): Number of bookmakers quoting each game.
+    - n_markets (int): Number of markets per bookmaker, starting with h2h.
+    - seed (int): Random seed.
+    - game_date (date): Local date of the slate. Defaults to today in the slate timezone.
+
+    Returns:
+    - list: Games in the shape returned by The Odds API.
+    """
+
+    rng = np.random.default_rng(seed)
+    teams = list(team_to_id)
+    bookmakers = ["FanDuel", "DraftKings", "Barstool Sportsbook"] + \
+        [f"Book {i}" for i in range(max(n_bookmakers - 3, 0))]
+    markets = (['h2h'] + extra_markets)[:n_markets]
+    tz = pytz.timezone(slate_timezone)
+    game_date = game_date or datetime.now(tz).date()
+    first_pitch = tz.localize(datetime.combine(game_date, time(13, 5))).astimezone(pytz.utc)
+
+    games = []
+    for i in range(n_games):
+        order = rng.permutation(len(teams))
+        home_team, away_team = teams[order[0]], teams[order[1]]
+        games.append({
+            'id': f"game{i}",
+            'home_team': home_team,
+            'away_team': away_team,
+            'commence_time': (first_pitch + timedelta(minutes=15 * (i % 12))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'bookmakers': [{
+                'key': bookmaker.lower().replace(' ', '_'),
+                'title': bookmaker,
+                'markets': [{
+                    'key': market,
+                    'outcomes': [
+                        {'name': home_team, 'price': _american_price(rng)},
+                        {'name': away_team, 'price': _american_price(rng)},
+                    ],
+                } for market in markets],
+            } for bookmaker in bookmakers[:n_bookmakers]],
+        })
+
+    return games
+
+
+def make_team_tables(seed=0):
+    """
+    Generate pybaseball-shaped batting, pitching, fielding and standings tables.
+
+    The tables carry the unprefixed columns behind every entry of the features list, plus the team name
+    columns used to map teams to IDs, and 'Team_ID' as the first column, like fetch_table.
+
+    Args:
+    - seed (int): Random seed.
+
+    Returns:
+    - Tuple: Four DataFrames containing batting, pitching, fielding, and standings data.
+    """
+
+    rng = np.random.default_rng(seed)
+    n_teams = len(team_to_id)
+
+    def table(prefix, name_column, names):
+        columns = [feature[len(prefix):] for feature in features if feature.startswith(prefix)]
+        data = pd.DataFrame(rng.random((n_teams, len(columns))) * 100, columns=columns)
+        data.insert(0, name_column, names)
+        data.insert(0, 'Team_ID', range(1, n_teams + 1))
+        return data
+
+    batting_data = table('bat_', 'Team', sorted(team_abbrev_to_id, key=team_abbrev_to_id.get))
+    pitching_data = table('pit_', 'Team', sorted(team_abbrev_to_id, key=team_abbrev_to_id.get))
+    fielding_data = table('field_', 'Team', sorted(team_names_only, key=team_names_only.get))
+
+    # Standings come from Baseball Reference as strings
+    wins = rng.integers(50, 110, n_teams)
+    losses = 162 - wins
+    standings_data = pd.DataFrame({
+        'Team_ID': range(1, n_teams + 1),
+        'Tm': sorted(team_to_id, key=team_to_id.get),
+        'W': wins.astype(str),
+        'L': losses.astype(str),
+        'W-L%': [f"{w / 162:.3f}" for w in wins],
+    })
+
+    return batting_data, pitching_data, fielding_data, standings_data
@@ -0,0 +1,141 @@
+"""
+assets.py
+---------
+
+This module keeps a local cache of the bookmaker logos embedded in the email.
+Logos are downloaded once, stored on disk and loaded into memory at startup. Stale logos are refreshed by a
+background thread so rendering the email never waits on the logo hosts.
+
+Functions:
+- logo_cid: Get the Content-ID used to reference a bookmaker logo in the email.
+- load_logos: Load the bookmaker logos from the local cache, downloading any that are missing.
+- refresh_logos_in_background: Refresh stale bookmaker logos on a background thread.
+- get_logos: Return the preloaded bookmaker logos.
+
+Imports:
+- Standard libraries: os, re, time, threading
+- External libraries: requests, modules.constants, modules.cache
+"""
+
+import os
+import re
+import time
+import threading
+import requests
+from modules.constants import bookmaker_icon_urls, logo_cache_dir, logo_max_age_hours
+from modules.cache import atomic_write
+
+_logos = {}
+_logos_lock = threading.Lock()
+
+
+def logo_cid(bookmaker_name):
+    """
+    Get the Content-ID used to reference a bookmaker logo in the email.
+
+    Args:
+    - bookmaker_name (str): Name of the bookmaker.
+
+    Returns:
+    - str: Content-ID without angle brackets, e.g. 'logo-fanduel'.
+    """
+
+    return "logo-" + re.sub(r'[^a-z0-9]+', '-', bookmaker_name.lower()).strip('-')
+
+
+def _logo_path(bookmaker_name, directory):
+    """Build the path of the cached logo file for a bookmaker."""
+    return os.path.join(directory, f"{logo_cid(bookmaker_name)}.png")
+
+
+def _download_logo(bookmaker_name, url, directory):
+    """Download a logo and atomically store it in the cache directory."""
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+
+    os.makedirs(directory, exist_ok=True)
+    path = _logo_path(bookmaker_name, directory)
+
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+
+    atomic_write(path, write)
+    return response.content
+
+
+def load_logos(urls=bookmaker_icon_urls, directory=logo_cache_dir):
+    """
+    Load the bookmaker logos from the local cache, downloading any that are missing.
+
+    A logo that cannot be downloaded is left out, and the email falls back to the bookmaker name.
+
+    Args:
+    - urls (dict): Mapping of bookmaker names to logo URLs.
+    - directory (str): Directory holding the cached logos.
+
+    Returns:
+    - dict: Mapping of bookmaker names to PNG bytes.
+    """
+
+    logos = {}
+    for bookmaker_name, url in urls.items():
+        path = _logo_path(bookmaker_name, directory)
+        try:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    logos[bookmaker_name] = f.read()
+            else:
+                logos[bookmaker_name] = _download_logo(bookmaker_name, url, directory)
+        except Exception as e:
+            print(f"Could not load the {bookmaker_name} logo: {str(e)}")
+
+    with _logos_lock:
+        _logos.update(logos)
+
+    return logos
+
+
+def refresh_logos_in_background(urls=bookmaker_icon_urls, directory=logo_cache_dir, max_age_hours=logo_max_age_hours):
+    """
+    Refresh stale bookmaker logos on a background thread.
+
+    Args:
+    - urls (dict): Mapping of bookmaker names to logo URLs.
+    - directory (str): Directory holding the cached logos.
+    - max_age_hours (float): Age in hours after which a cached logo is downloaded again.
+
+    Returns:
+    - Thread: The started daemon thread.
+    """
+
+    def refresh():
+        for bookmaker_name, url in urls.items():
+            path = _logo_path(bookmaker_name, directory)
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age_hours * 3600:
+                continue
+            try:
+                logo = _download_logo(bookmaker_name, url, directory)
+            except Exception as e:
+                print(f"Could not refresh the {bookmaker_name} logo: {str(e)}")
+                continue
+            with _logos_lock:
+                _logos[bookmaker_name] = logo
+
+    thread = threading.Thread(target=refresh, daemon=True)
+    thread.start()
+    return thread
+
+
+def get_logos():
+    """
+    Return the preloaded bookmaker logos, loading them from the cache on first use.
+
+    Returns:
+    - dict: Mapping of bookmaker names to PNG bytes.
+    """
+
+    with _logos_lock:
+        if _logos:
+            return dict(_logos)
+    return load_logos()
@@ -0,0 +1,240 @@
+"""
+backtest.py
+-----------
+
+This module replays the pipeline over past dates to measure how its picks would have done. For every date
+with archived odds snapshots in the history database and cached team stats as of that date, the model is
+trained on that day's stats, recommendations are made from the last odds seen before each game, and the
+picks are settled against the recorded results.
+
+Days are independent, so they are spread across a process pool. The team stats of every day are stacked
+into a single array written once to disk and memory-mapped read-only by the workers, so all workers share
+the same pages instead of each receiving its own copy.
+
+Usage:
+    python -m modules.backtest --start 2023-04-01 --end 2023-09-30 --workers 4 --output backtest_results.json
+
+Functions:
+- load_day_features: Load the cached team stats as of a date and align them on the Team_ID index.
+- backtest_day: Train, predict and settle the picks of a single day.
+- run_backtest: Replay every day in a date range on a process pool.
+- main: Parse the command line, run the backtest and write the results.
+
+Imports:
+- Standard libraries: io, os, sys, json, shutil, argparse, tempfile, contextlib, concurrent.futures, datetime
+- External libraries: numpy, pandas, joblib, modules
+"""
+
+import io
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import numpy as np
+import pandas as pd
+from joblib import parallel_backend
+from modules.constants import team_to_id, all_team_ids, history_db_path, table_prefixes
+from modules.cache import read_cached_table
+from modules.data_processing import build_slate, get_games_playing_today, get_game_key, project_columns, \
+    table_columns, assemble_features, split_training_data
+from modules.model import train_and_test_model, parse_data
+from modules.recommendation import decimal_odds
+from modules.history import get_snapshot_dates, load_snapshot_games, load_results
+
+# Read-only state of a worker process, set once by _init_worker
+_worker_state = {}
+
+
+def load_day_features(game_date):
+    """
+    Load the cached team stats as of a date and align them on the Team_ID index.
+
+    Team stats cannot be fetched retroactively, so only dates for which a daily run cached its tables can
+    be replayed.
+
+    Args:
+    - game_date (date): The date the stats must be as of.
+
+    Returns:
+    - DataFrame: Numeric team stats indexed by Team_ID, as returned by assemble_features, or None if a
+      table is not cached for the date.
+    """
+
+    tables = []
+    for table, prefix in table_prefixes.items():
+        dataframe = read_cached_table(table, game_date.year, as_of=game_date, ttl_hours=None,
+                                      columns=table_columns(prefix))
+        if dataframe is None:
+            return None
+        tables.append(project_columns(dataframe, prefix))
+
+    with redirect_stdout(io.StringIO()):
+        mlb_data = assemble_features(*tables)
+    return mlb_data.select_dtypes(include=['number', 'bool'])
+
+
+def _init_worker(features_path, columns, strategy, n_iter):
+    """Memory-map the shared team stats once per worker process."""
+    _worker_state['features'] = np.load(features_path, mmap_mode='r')
+    _worker_state['columns'] = columns
+    _worker_state['strategy'] = strategy
+    _worker_state['n_iter'] = n_iter
+
+
+def backtest_day(task):
+    """
+    Train, predict and settle the picks of a single day.
+
+    Args:
+    - task (tuple): Position of the day in the shared team stats, the game date, the games rebuilt from the
+      odds snapshots and a dictionary mapping game IDs to winners.
+
+    Returns:
+    - dict: The date, the picks with their expected value and realized profit per unit staked, and the
+      day's totals. If the day failed, an 'error' key describes why.
+    """
+
+    index, game_date, games, results = task
+    summary = {'date': game_date.isoformat(), 'games': len(games), 'picks': []}
+
+    mlb_data = pd.DataFrame(np.array(_worker_state['features'][index]),
+                            index=pd.Index(all_team_ids, name='Team_ID'), columns=_worker_state['columns'])
+    mlb_data['complete'] = mlb_data['complete'].astype(bool)
+
+    try:
+        # The days already run in parallel, so each search runs on a single core
+        with redirect_stdout(io.StringIO()), parallel_backend('sequential'):
+            slate = build_slate(games)
+            team_ids = get_games_playing_today(slate, team_to_id, game_date)
+            train_data, test_data, feature_matrix = split_training_data(mlb_data, team_ids)
+            model = train_and_test_model(train_data, test_data, use_store=False,
+                                         strategy=_worker_state['strategy'], n_iter=_worker_state['n_iter'])[0]
+            picks = parse_data(slate, model, feature_matrix, team_to_id, game_date)
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+        return summary
+
+    for game in picks:
+        recommendation = game['recommendation']
+        winner = results.get(game['game_id'])
+        profit = None
+        if winner is not None and recommendation['price'] is not None:
+            profit = decimal_odds(recommendation['price']) - 1 if winner == recommendation['team'] else -1.0
+        summary['picks'].append({
+            'game_id': game['game_id'],
+            'team': recommendation['team'],
+            'bookmaker': recommendation['bookmaker'],
+            'price': recommendation['price'],
+            'predicted_win_pct': float(recommendation['predicted_win_pct']),
+            'expected_value': float(recommendation['expected_value']),
+            'winner': winner,
+            'profit': profit,
+        })
+
+    settled = [pick['profit'] for pick in summary['picks'] if pick['profit'] is not None]
+    summary['expected_value'] = sum(pick['expected_value'] for pick in summary['picks'])
+    summary['settled'] = len(settled)
+    summary['profit'] = sum(settled)
+    return summary
+
+
+def run_backtest(start_date=None, end_date=None, max_workers=None, strategy='random', n_iter=10,
+                 path=history_db_path):
+    """
+    Replay every day in a date range on a process pool.
+
+    Args:
+    - start_date (date): First game date to replay. Defaults to the first archived date.
+    - end_date (date): Last game date to replay. Defaults to the last archived date.
+    - max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+    - strategy (str): Hyperparameter search strategy used for each day's model.
+    - n_iter (int): Number of candidates for the 'random' strategy.
+    - path (str): Path of the history database holding the odds snapshots and results.
+
+    Returns:
+    - list: Summaries from backtest_day, one per replayed day in date order.
+    """
+
+    days, frames = [], []
+    for game_date in get_snapshot_dates(start_date, end_date, path):
+        mlb_data = load_day_features(game_date)
+        if mlb_data is None:
+            print(f"Skipping {game_date}: no cached team stats as of that date")
+            continue
+        days.append(game_date)
+        frames.append(mlb_data)
+
+    if not days:
+        raise Exception("No days have both archived odds snapshots and cached team stats.")
+
+    results = load_results(start_date, end_date, path)
+    columns = list(frames[0].columns)
+    tasks = []
+    for index, game_date in enumerate(days):
+        games = load_snapshot_games(game_date, path)
+        day_results = {get_game_key(game): results[get_game_key(game)]
+                       for game in games if get_game_key(game) in results}
+        tasks.append((index, game_date, games, day_results))
+
+    shared_dir = tempfile.mkdtemp(prefix="backtest_")
+    try:
+        features_path = os.path.join(shared_dir, "features.npy")
+        np.save(features_path, np.stack([frame.reindex(columns=columns).to_numpy(dtype=np.float32)
+                                         for frame in frames]))
+        del frames
+
+        print(f"Replaying {len(days)} days from {days[0]} to {days[-1]}...")
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(features_path, columns, strategy, n_iter)) as executor:
+            return list(executor.map(backtest_day, tasks))
+    finally:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    """
+    Parse the command line, run the backtest and write the results.
+
+    Args:
+    - argv (list): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+    - int: Exit code.
+    """
+
+    parser = argparse.ArgumentParser(description="Replay the MLB betting pipeline over past dates.")
+    parser.add_argument('--start', type=date.fromisoformat, help="First game date, e.g. 2023-04-01.")
+    parser.add_argument('--end', type=date.fromisoformat, help="Last game date, e.g. 2023-09-30.")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--strategy', default='random', choices=['grid', 'random', 'halving'])
+    parser.add_argument('--n-iter', type=int, default=10)
+    parser.add_argument('--history', default=history_db_path, help="History database to replay.")
+    parser.add_argument('--output', default='backtest_results.json')
+    args = parser.parse_args(argv)
+
+    days = run_backtest(args.start, args.end, args.workers, args.strategy, args.n_iter, args.history)
+    with open(args.output, 'w') as f:
+        json.dump(days, f, indent=4)
+
+    print(f"{'Date':<12} {'Picks':>5} {'Settled':>7} {'EV':>8} {'Profit':>8}")
+    for day in days:
+        if 'error' in day:
+            print(f"{day['date']:<12} failed: {day['error']}")
+            continue
+        print(f"{day['date']:<12} {len(day['picks']):>5} {day['settled']:>7} "
+              f"{day['expected_value']:>8.3f} {day['profit']:>8.3f}")
+
+    settled = sum(day.get('settled', 0) for day in days)
+    profit = sum(day.get('profit', 0) for day in days)
+    print(f"Total profit: {profit:.3f} units over {settled} settled picks"
+          + (f" (ROI {profit / settled * 100:.1f}%)" if settled else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
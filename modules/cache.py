@@ -0,0 +1,125 @@
+"""
+cache.py
+--------
+
+This module provides an on-disk cache for the pybaseball team tables used by the MLB betting application.
+Tables are stored as compressed Parquet files keyed by table name, season and the date the stats are as of,
+so a warm run can skip the slow pybaseball scrapes entirely.
+
+Functions:
+- cache_path: Build the cache file path for a table.
+- read_cached_table: Load a table from the cache if it exists and is still fresh.
+- atomic_write: Write a file through a temporary file in the same directory, then move it into place.
+- write_cached_table: Atomically write a table to the cache.
+
+Imports:
+- Standard libraries: os, time, tempfile, datetime
+- External libraries: pandas, pyarrow, modules.constants
+"""
+
+import os
+import time
+import tempfile
+from datetime import date
+import pandas as pd
+import pyarrow.parquet as pq
+from modules.constants import cache_dir, cache_ttl_hours
+
+
+def cache_path(table, year, as_of=None, directory=cache_dir):
+    """
+    Build the cache file path for a table.
+
+    Args:
+    - table (str): Name of the table (e.g. 'batting').
+    - year (int): The season the table covers.
+    - as_of (date): The date the stats are as of. Defaults to today.
+    - directory (str): Directory holding the cache files.
+
+    Returns:
+    - str: Path of the Parquet file for the table.
+    """
+
+    as_of = as_of or date.today()
+    return os.path.join(directory, f"{table}_{year}_{as_of.isoformat()}.parquet")
+
+
+def read_cached_table(table, year, as_of=None, ttl_hours=cache_ttl_hours, directory=cache_dir, columns=None):
+    """
+    Load a table from the cache if it exists and is still fresh.
+
+    The full table is cached, so when columns are given only those columns are read from the Parquet file.
+
+    Args:
+    - table (str): Name of the table.
+    - year (int): The season the table covers.
+    - as_of (date): The date the stats are as of. Defaults to today.
+    - ttl_hours (float): Maximum age of the cache file in hours. None means the file never expires.
+    - directory (str): Directory holding the cache files.
+    - columns (list): Columns to load. Columns missing from the file are skipped. Defaults to all columns.
+
+    Returns:
+    - DataFrame: The cached table, or None if it is missing or stale.
+    """
+
+    path = cache_path(table, year, as_of, directory)
+    if not os.path.exists(path):
+        return None
+
+    if ttl_hours is not None and time.time() - os.path.getmtime(path) > ttl_hours * 3600:
+        return None
+
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = [column for column in columns if column in available]
+    return pd.read_parquet(path, columns=columns)
+
+
+def atomic_write(path, write):
+    """
+    Write a file through a temporary file in the same directory, then move it into place.
+
+    Readers never see a half-written file, and the temporary file is removed if the write fails.
+
+    Args:
+    - path (str): Path of the file to write.
+    - write (function): Called with the temporary path, writes the file contents to it.
+
+    Returns:
+    - None
+    """
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or None, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_cached_table(dataframe, table, year, as_of=None, directory=cache_dir):
+    """
+    Atomically write a table to the cache.
+
+    The table is written to a temporary file in the cache directory and then moved into place,
+    so a crashed or concurrent run never leaves a half-written file behind.
+
+    Args:
+    - dataframe (DataFrame): The table to cache.
+    - table (str): Name of the table.
+    - year (int): The season the table covers.
+    - as_of (date): The date the stats are as of. Defaults to today.
+    - directory (str): Directory holding the cache files.
+
+    Returns:
+    - str: Path of the written Parquet file.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    path = cache_path(table, year, as_of, directory)
+
+    atomic_write(path, lambda tmp_path: dataframe.to_parquet(tmp_path, index=False, compression="zstd"))
+    return path
@@ -11,6 +11,36 @@ Variables:
 - team_names_only: Dictionary mapping shortened team names (from fielding data) to their respective IDs.
 - team_abbrev_to_id: Dictionary mapping team abbreviations to their respective IDs.
 - features: List of feature names used in the model.
+- all_team_ids: Sorted list of every team ID.
+- team_name_columns: Dictionary mapping feature prefixes to the team name column of each pybaseball table.
+- table_prefixes: Dictionary mapping pybaseball table names to the prefix of their features.
+- cache_dir: Directory where cached pybaseball tables are stored.
+- cache_ttl_hours: Number of hours a cached pybaseball table stays fresh.
+- fetch_max_workers: Maximum number of pybaseball tables fetched at the same time.
+- fetch_timeout_seconds: Number of seconds a single pybaseball table fetch may take.
+- training_seasons: Number of seasons, counting the current one, whose team stats the model trains on.
+- preseason_end: Month and day until which a current season without stats falls back to the previous season.
+- odds_api_timeout: Connect and read timeouts in seconds for The Odds API.
+- odds_api_max_retries: Number of retries on rate-limited or failed Odds API requests.
+- odds_api_backoff_seconds: Base delay in seconds for the exponential backoff between retries.
+- odds_api_cache_seconds: Number of seconds an Odds API response is reused.
+- slate_timezone: Timezone used to group games into a day's slate.
+- model_store_dir: Directory where trained models are stored by fingerprint.
+- search_strategy: Hyperparameter search strategy ('grid', 'random' or 'halving').
+- search_n_iter: Number of candidates sampled by the randomized search.
+- search_time_budget_seconds: Wall-clock budget for the hyperparameter search, or None for no limit.
+- training_mode: 'full' to search hyperparameters every run, or 'incremental' to grow the previous model.
+- warm_start_max_new_trees: Maximum number of trees replaced by an incremental update.
+- retune_interval_days: Number of days after which incremental mode runs a full search again.
+- drift_threshold: Relative increase in validation MSE that triggers a full search in incremental mode.
+- bookmaker_icon_urls: Dictionary mapping bookmaker names to the URLs of their logos.
+- logo_cache_dir: Directory where bookmaker logos are cached.
+- logo_max_age_hours: Number of hours after which a cached bookmaker logo is refreshed.
+- history_db_path: Path of the SQLite database holding the recommendation and odds history.
+- daemon_poll_seconds: Number of seconds between Odds API polls in daemon mode.
+- daemon_price_threshold: Change of a game's best decimal price that triggers a new email in daemon mode.
+- daemon_ev_threshold: Change of a game's expected value that triggers a new email in daemon mode.
+- recommendation_cache_size: Maximum number of per-game recommendations kept in the LRU cache.
 """
 
 # Hyperparameters for RandomForestRegressor grid search
@@ -125,6 +155,25 @@ team_abbrev_to_id = {
     "WSN": 30
 }
 
+# Every team ID, used to index the feature matrix
+all_team_ids = sorted(team_to_id.values())
+
+# Team name column of each pybaseball table, keyed by the prefix of its features
+team_name_columns = {
+    'bat_': 'Team',
+    'pit_': 'Team',
+    'field_': 'Team',
+    'stand_': 'Tm'
+}
+
+# Prefix of the features taken from each pybaseball table
+table_prefixes = {
+    'batting': 'bat_',
+    'pitching': 'pit_',
+    'fielding': 'field_',
+    'standings': 'stand_'
+}
+
 # Features list used for training and predicting with the model
 features = [
     # Batting
@@ -147,3 +196,61 @@ features = [
     # Standings
     "stand_W", "stand_L", "stand_W-L%"
 ]
+
+# On-disk cache for pybaseball team tables
+cache_dir = 'data/cache'
+cache_ttl_hours = 24
+
+# Concurrent fetching of pybaseball team tables
+fetch_max_workers = 4
+fetch_timeout_seconds = 120
+
+# Number of seasons of team stats used for training
+training_seasons = 1
+
+# Before Opening Day the current season has no stats yet, so until this (month, day) a current season that
+# cannot be fetched falls back to the previous season
+preseason_end = (4, 15)
+
+# HTTP client settings for The Odds API
+odds_api_timeout = (5, 30)
+odds_api_max_retries = 3
+odds_api_backoff_seconds = 1
+odds_api_cache_seconds = 60
+
+# Timezone used to decide which date a game is played on
+slate_timezone = 'America/New_York'
+
+# Directory for trained models keyed by the fingerprint of their inputs
+model_store_dir = 'data/models'
+
+# Hyperparameter search settings
+search_strategy = 'grid'
+search_n_iter = 50
+search_time_budget_seconds = None
+
+# Incremental warm-start training
+training_mode = 'full'
+warm_start_max_new_trees = 50
+retune_interval_days = 7
+drift_threshold = 0.25
+
+# Bookmaker logos embedded in the email
+bookmaker_icon_urls = {
+    "FanDuel": "https://s3.amazonaws.com/rical-misc/FanDuel-vertical-logo.png",
+    "DraftKings": "https://companieslogo.com/img/orig/DKNG-e9ded183.png?t=1660587881",
+    "Barstool Sportsbook": "https://www.pinclipart.com/picdir/big/36-361767_chicago-transparent-barstool-sports-clip-art-royalty-barstool.png",
+}
+logo_cache_dir = 'data/logos'
+logo_max_age_hours = 24 * 7
+
+# Append-only recommendation and odds history
+history_db_path = 'data/history.db'
+
+# Daemon mode
+daemon_poll_seconds = 300
+daemon_price_threshold = 0.05
+daemon_ev_threshold = 0.02
+
+# Memoization of per-game recommendations
+recommendation_cache_size = 1024
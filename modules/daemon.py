@@ -0,0 +1,185 @@
+"""
+daemon.py
+---------
+
+This module keeps the MLB betting application running after the daily email has been sent and follows the
+lines as they move. The trained model and the feature matrix stay in memory, The Odds API is polled on an
+interval, and each snapshot is compared with the previous one per game and bookmaker. Only the games whose
+quotes changed are re-priced, and the email is only sent again when a game's pick, best price or expected
+value moved past a threshold since the last email.
+
+Functions:
+- diff_snapshots: Find the games whose quotes changed between two odds snapshots.
+- is_material_change: Check whether a game's recommendation moved enough to send it again.
+- run_daemon: Poll The Odds API and re-send the recommendations when they change materially.
+
+Imports:
+- Standard libraries: time, datetime
+- External libraries: pytz, modules
+"""
+
+import time
+from datetime import datetime
+import pytz
+from modules.constants import team_to_id, slate_timezone, daemon_poll_seconds, daemon_price_threshold, \
+    daemon_ev_threshold
+from modules.odds_api import get_default_client
+from modules.data_processing import build_slate, get_slate_games, get_game_key, build_odds_table
+from modules.recommendation import get_recommendations_for_slate, decimal_odds, get_recommendation_cache_stats
+from modules.email_utils import create_email_template, create_plaintext_body, send_email
+from modules.history import record_odds_snapshot, record_recommendations
+
+
+def diff_snapshots(previous, current):
+    """
+    Find the games whose quotes changed between two odds snapshots.
+
+    Args:
+    - previous (DataFrame): Odds table of the previous snapshot, built by build_odds_table.
+    - current (DataFrame): Odds table of the current snapshot.
+
+    Returns:
+    - set: IDs of the games with a new, changed or withdrawn quote at any bookmaker.
+    """
+
+    keys = ['game_id', 'bookmaker', 'market', 'outcome']
+    merged = previous[keys + ['price']].merge(
+        current[keys + ['price']], on=keys, how='outer', suffixes=('_previous', '_current'))
+    changed = merged['price_previous'].ne(merged['price_current'])
+    return set(merged.loc[changed, 'game_id'])
+
+
+def is_material_change(previous, current, price_threshold=daemon_price_threshold, ev_threshold=daemon_ev_threshold):
+    """
+    Check whether a game's recommendation moved enough to send it again.
+
+    Args:
+    - previous (dict): The recommendation last sent for the game, or None.
+    - current (dict): The current recommendation for the game, or None.
+    - price_threshold (float): Minimum change of the best decimal price.
+    - ev_threshold (float): Minimum change of the expected value.
+
+    Returns:
+    - bool: True if the pick appeared, disappeared or switched teams, or its price or expected value moved
+      by at least the thresholds.
+    """
+
+    if previous is None or current is None:
+        return previous is not current
+    if previous['team'] != current['team']:
+        return True
+    if abs(decimal_odds(current['price']) - decimal_odds(previous['price'])) >= price_threshold:
+        return True
+    return abs(current['expected_value'] - previous['expected_value']) >= ev_threshold
+
+
+def _game_entry(game, recommendation):
+    """Build the email entry of a game, in the format returned by parse_data."""
+    return {
+        'game_id': get_game_key(game),
+        'home_team': game['home_team'],
+        'away_team': game['away_team'],
+        'commence_time': game['commence_time'],
+        'start_time': game['start_time'],
+        'recommendation': recommendation,
+    }
+
+
+def run_daemon(model, feature_matrix, metrics, slate, games, logos=None, client=None, interval=daemon_poll_seconds,
+               price_threshold=daemon_price_threshold, ev_threshold=daemon_ev_threshold, max_polls=None):
+    """
+    Poll The Odds API and re-send the recommendations when they change materially.
+
+    The daemon returns when the local date changes, so the next run retrains on the new day's data.
+
+    Args:
+    - model (RandomForestRegressor): The trained model, kept in memory between polls.
+    - feature_matrix (DataFrame): Team_ID-indexed feature matrix built by build_feature_matrix.
+    - metrics (tuple): MAE, MSE and R2 of the model, shown in the email.
+    - slate (dict): Slate index of the odds the initial email was based on.
+    - games (list): Games with recommendations from the initial email, as returned by parse_data.
+    - logos (dict): Mapping of bookmaker names to PNG bytes for the email.
+    - client (OddsApiClient): Client to poll with. Defaults to the shared client.
+    - interval (float): Seconds between polls.
+    - price_threshold (float): Minimum change of a game's best decimal price that triggers a new email.
+    - ev_threshold (float): Minimum change of a game's expected value that triggers a new email.
+    - max_polls (int): Stop after this many polls. None polls until the date changes.
+
+    Returns:
+    - int: Number of emails sent.
+    """
+
+    client = client or get_default_client()
+    tz = pytz.timezone(slate_timezone)
+    game_date = datetime.now(tz).date()
+
+    sent = {game['game_id']: game for game in games}
+    latest = dict(sent)
+    previous_table = build_odds_table(get_slate_games(slate, game_date))
+    polls = 0
+    emails = 0
+
+    print(f"Polling The Odds API every {interval}s...")
+    while max_polls is None or polls < max_polls:
+        time.sleep(interval)
+        polls += 1
+        now = datetime.now(tz)
+        if now.date() != game_date:
+            print("The slate date changed, stopping the daemon")
+            break
+
+        # Skip the response cache so every poll sees the current lines
+        client.clear_cache()
+        try:
+            current_games = get_slate_games(build_slate(client.get()), game_date)
+        except Exception as e:
+            print(f"Polling The Odds API failed: {e}")
+            continue
+
+        current_table = build_odds_table(current_games)
+        changed = diff_snapshots(previous_table, current_table)
+        previous_table = current_table
+
+        changed_games = [game for game in current_games
+                         if get_game_key(game) in changed and game['start_time'] > now]
+        if not changed_games:
+            continue
+
+        # Re-price only the games whose quotes changed
+        record_odds_snapshot(changed_games)
+        changed_keys = {get_game_key(game) for game in changed_games}
+        recommendations = get_recommendations_for_slate(
+            changed_games, model, feature_matrix, team_to_id,
+            odds_table=current_table[current_table['game_id'].isin(changed_keys)])
+        cache_stats = get_recommendation_cache_stats()
+        print(f"Re-priced {len(changed_games)} games (recommendation cache: {cache_stats['hits']} hits, "
+              f"{cache_stats['misses']} misses)")
+
+        material = []
+        for game, recommendation in zip(changed_games, recommendations):
+            key = get_game_key(game)
+            if recommendation:
+                latest[key] = _game_entry(game, recommendation)
+            else:
+                latest.pop(key, None)
+            if is_material_change(sent.get(key, {}).get('recommendation'), recommendation,
+                                  price_threshold, ev_threshold):
+                material.append(key)
+
+        if not material:
+            print("No recommendation moved past the thresholds")
+            continue
+
+        upcoming = sorted([entry for entry in latest.values() if entry['start_time'] > now],
+                          key=lambda entry: entry['start_time'])
+        print(f"{len(material)} games moved past the thresholds, re-sending {len(upcoming)} recommendations...")
+        email_body = create_email_template(upcoming, *metrics, logos=logos)
+        text_body = create_plaintext_body(upcoming, *metrics)
+        send_email(email_body, text_body, logos=logos)
+        record_recommendations([latest[key] for key in material if key in latest],
+                               getattr(model, 'fingerprint_', None))
+
+        sent = dict(latest)
+        emails += 1
+
+    return emails
@@ -7,87 +7,299 @@ It uses both The Odds API and the pybaseball library to retrieve game data and s
 
 Functions:
 - fetch_data_from_api: Fetch game data from The Odds API.
-- fetch_data_from_pybaseball: Fetch MLB statistics for teams using the pybaseball library.
+- season_is_finished: Check whether a season was over by a given date.
+- fetch_table: Fetch a single pybaseball team table, going through the on-disk cache.
+- fetch_seasons: Fetch the pybaseball team tables of several seasons concurrently.
+- fetch_training_seasons: Fetch the team tables of the training seasons, ending with the latest season that has stats.
 
 Constants:
-- year: Represents the year for which the data is fetched.
+- table_fetchers: Mapping of pybaseball table names to the functions that fetch them.
 
 Imports:
-- Standard libraries: os, requests, json, pandas
-- External libraries: dotenv, pybaseball
-- Local modules: constants
+- Standard libraries: time, datetime, concurrent.futures, pandas
+- External libraries: pybaseball
+- Local modules: constants, cache, odds_api, instrumentation
 """
 
-import os
-import requests
-import json
+import time
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
-from dotenv import load_dotenv
 from pybaseball import team_batting, team_pitching, team_fielding, standings
-from modules.constants import team_to_id, team_names_only, team_abbrev_to_id
+from modules.constants import team_to_id, team_names_only, team_abbrev_to_id, cache_ttl_hours, \
+    fetch_max_workers, fetch_timeout_seconds, preseason_end
+from modules.cache import read_cached_table, write_cached_table
+from modules.odds_api import get_default_client
+from modules.instrumentation import timed
 
-year = 2023
 
-
-def fetch_data_from_api():
+@timed()
+def fetch_data_from_api(client=None):
     """
     Fetch game data from The Odds API.
 
-    This function reads the API link from the environment, fetches data, and returns it in JSON format.
+    This function fetches the API link from the environment through a pooled, retrying client and returns it in JSON format.
+    Calls made within the client's cache window reuse the previous response.
+
+    Args:
+    - client (OddsApiClient): Client to use. Defaults to the shared client.
 
     Returns:
     - Dictionary: JSON formatted data fetched from the API.
     """
-    load_dotenv()
-    api_data = os.getenv("API_LINK")
-    response = requests.get(api_data)
+    client = client or get_default_client()
+    return client.get()
 
-    if response.status_code != 200:
-        raise Exception("Failed to fetch data from API")
 
-    return json.loads(response.text)
-
-
-def fetch_data_from_pybaseball(year):
+def _team_id_first(dataframe):
     """
-    Fetch MLB statistics for teams using the pybaseball library.
-
-    This function fetches team statistics for batting, pitching, fielding, and standings.
-    It then maps the team names/abbreviations to team IDs, reorders the columns, and saves the data to CSV files.
+    Reorder the columns of a dataframe so that 'Team_ID' is the first column.
 
     Args:
-    - year (int): The year for which to fetch the data.
+    - dataframe (DataFrame): Input dataframe with a 'Team_ID' column.
 
     Returns:
-    - Tuple: Four DataFrames containing batting, pitching, fielding, and standings data.
+    - DataFrame: DataFrame with 'Team_ID' as the first column.
     """
-    batting_data = team_batting(year)
-    pitching_data = team_pitching(year)
-    fielding_data = team_fielding(year)
-    standings_data_list = standings(year)
 
-    # Concatenate the list of DataFrames to form a single DataFrame
-    standings_data = pd.concat(standings_data_list, ignore_index=True)
+    cols = list(dataframe.columns)
+    cols.insert(0, cols.pop(cols.index('Team_ID')))
+    return dataframe[cols]
 
-    # Map 'Tm' column to 'Team_ID' using the team_to_id dictionary
-    standings_data['Team_ID'] = standings_data['Tm'].map(team_to_id)
 
-    # Map team abbreviations to team IDs
+def _fetch_batting(year):
+    """Fetch team batting data from pybaseball and map it to team IDs."""
+    batting_data = team_batting(year)
     batting_data["Team_ID"] = batting_data["Team"].map(team_abbrev_to_id)
+    return _team_id_first(batting_data)
+
+
+def _fetch_pitching(year):
+    """Fetch team pitching data from pybaseball and map it to team IDs."""
+    pitching_data = team_pitching(year)
     pitching_data["Team_ID"] = pitching_data["Team"].map(team_abbrev_to_id)
+    return _team_id_first(pitching_data)
+
+
+def _fetch_fielding(year):
+    """Fetch team fielding data from pybaseball and map it to team IDs."""
+    fielding_data = team_fielding(year)
     fielding_data["Team_ID"] = fielding_data["Team"].map(team_names_only)
+    return _team_id_first(fielding_data)
+
+
+def _fetch_standings(year):
+    """Fetch team standings data from pybaseball and map it to team IDs."""
+    # Concatenate the list of division DataFrames to form a single DataFrame
+    standings_data = pd.concat(standings(year), ignore_index=True)
     standings_data["Team_ID"] = standings_data["Tm"].map(team_to_id)
+    return _team_id_first(standings_data)
+
+
+# Fetchers for each pybaseball table, in the order fetch_seasons returns them
+table_fetchers = {
+    'batting': _fetch_batting,
+    'pitching': _fetch_pitching,
+    'fielding': _fetch_fielding,
+    'standings': _fetch_standings,
+}
+
+
+def season_is_finished(season, as_of=None):
+    """
+    Check whether a season was over by a given date.
+
+    Args:
+    - season (int): The season.
+    - as_of (date): The date to check against. Defaults to today.
+
+    Returns:
+    - bool: True if the season ended before the year of as_of.
+    """
+
+    return season < (as_of or date.today()).year
+
+
+def fetch_table(table, year, as_of=None, ttl_hours=cache_ttl_hours, refresh=False, columns=None):
+    """
+    Fetch a single pybaseball team table, going through the on-disk cache.
+
+    A finished season's stats no longer change, so its tables are cached once under the last day of the
+    season's year and never expire. The full table is cached, and only the requested columns are returned.
+
+    Args:
+    - table (str): Name of the table, one of the keys of table_fetchers.
+    - year (int): The year for which to fetch the data.
+    - as_of (date): The date the stats are as of. Defaults to today.
+    - ttl_hours (float): Maximum age of a cached table in hours.
+    - refresh (bool): If True, ignore the cache and fetch the table from pybaseball.
+    - columns (list): Columns to return, starting with 'Team_ID'. Missing columns are skipped. Defaults to
+      all columns.
+
+    Returns:
+    - DataFrame: The requested table with 'Team_ID' as the first column.
+    """
+
+    if season_is_finished(year, as_of):
+        as_of, ttl_hours = date(year, 12, 31), None
+
+    if not refresh:
+        cached = read_cached_table(table, year, as_of, ttl_hours, columns=columns)
+        if cached is not None:
+            return cached
+
+    dataframe = table_fetchers[table](year)
+    write_cached_table(dataframe, table, year, as_of)
+    if columns is not None:
+        dataframe = dataframe[[column for column in columns if column in dataframe.columns]]
+    return dataframe
+
+
+def _timed_fetch_table(table, year, as_of, ttl_hours, refresh, columns=None, started=None, key=None):
+    """
+    Fetch a single table and return it along with the elapsed wall time in seconds.
+
+    If a started dictionary is given, the monotonic time the fetch began is recorded in it under key, so
+    the caller can time the fetch from when it left the queue rather than from when it was submitted.
+    """
+    if started is not None:
+        started[key] = time.monotonic()
+    start = time.perf_counter()
+    dataframe = fetch_table(table, year, as_of, ttl_hours, refresh, columns)
+    return dataframe, time.perf_counter() - start
+
+
+def _fetch_concurrently(jobs, as_of, ttl_hours, refresh, max_workers, timeout, columns=None):
+    """
+    Fetch (table, year) jobs on a bounded thread pool and raise all failures together.
+
+    Each job's timeout counts from when it starts running, so jobs queued behind the pool's workers are not
+    charged for the wait. Jobs that never start because every worker is held by a fetch that already timed
+    out are reported as failed instead of waiting indefinitely.
+
+    Args:
+    - jobs (dict): Mapping of result keys to (table, year) pairs.
+    - as_of, ttl_hours, refresh, max_workers, timeout, columns: See fetch_seasons.
+
+    Returns:
+    - Tuple: A dictionary mapping keys to DataFrames and a dictionary mapping keys to fetch times in seconds.
+    """
+
+    tables = {}
+    timings = {}
+    errors = {}
+    started = {}
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {}
+        for key, (table, year) in jobs.items():
+            futures[executor.submit(
+                _timed_fetch_table, table, year, as_of, ttl_hours, refresh, (columns or {}).get(table), started,
+                key)] = key
+
+        pending = set(futures)
+        timed_out = []
+        while pending:
+            now = time.monotonic()
+            for future in [future for future in pending if futures[future] in started and not future.done()]:
+                if now - started[futures[future]] >= timeout:
+                    errors[futures[future]] = f"timed out after {timeout}s"
+                    timed_out.append(future)
+                    pending.discard(future)
+
+            # Jobs still queued can never start while every worker is stuck on a timed-out fetch
+            if sum(not future.done() for future in timed_out) >= max_workers:
+                for future in pending:
+                    errors[futures[future]] = "not started, every worker is held by a timed-out fetch"
+                break
+
+            deadlines = [started[futures[future]] + timeout for future in pending if futures[future] in started]
+            # Wake up at the next deadline, and at least every second to notice jobs that have started
+            wait_time = min([max(deadline - now, 0) for deadline in deadlines] + [1.0])
+            done, _ = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                try:
+                    tables[futures[future]], timings[futures[future]] = future.result()
+                except Exception as e:
+                    errors[futures[future]] = f"{type(e).__name__}: {e}"
+    finally:
+        # Do not block on tables that timed out; their threads finish in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if errors:
+        details = "; ".join(f"{' '.join(map(str, key)) if isinstance(key, tuple) else key} ({error})"
+                            for key, error in errors.items())
+        raise Exception(f"Failed to fetch pybaseball tables: {details}")
+
+    return tables, timings
+
+
+@timed()
+def fetch_seasons(seasons, as_of=None, ttl_hours=cache_ttl_hours, refresh=False, max_workers=fetch_max_workers,
+                  timeout=fetch_timeout_seconds, columns=None):
+    """
+    Fetch the pybaseball team tables of several seasons concurrently.
+
+    The tables of all seasons share one thread pool. Finished seasons are served from their permanent
+    cache entries, so only the current season is refetched once its cache expires. The fetch time of every
+    table is printed.
+
+    Args:
+    - seasons (list): The seasons to fetch.
+    - as_of (date): The date the current season's stats are as of. Defaults to today.
+    - ttl_hours (float): Maximum age of a cached table of an unfinished season in hours.
+    - refresh (bool): If True, ignore the cache and refetch every table.
+    - max_workers (int): Maximum number of tables fetched at the same time.
+    - timeout (float): Seconds each table may take, counted from when its fetch starts.
+    - columns (dict): Optional mapping of table names to the columns to load, see fetch_table.
+
+    Returns:
+    - dict: Mapping of each season to its batting, pitching, fielding, and standings DataFrames.
+    """
+
+    jobs = {(season, table): (table, season) for season in seasons for table in table_fetchers}
+    tables, timings = _fetch_concurrently(jobs, as_of, ttl_hours, refresh, max_workers, timeout, columns)
+    for season, table in jobs:
+        print(f"Fetched {season} {table} data in {timings[(season, table)]:.2f}s")
+
+    return {season: tuple(tables[(season, table)] for table in table_fetchers) for season in seasons}
+
+
+def fetch_training_seasons(n_seasons, season=None, as_of=None, refresh=False, columns=None):
+    """
+    Fetch the team tables of the training seasons, ending with the latest season that has stats.
+
+    Before Opening Day the current season has no pybaseball tables yet. Until preseason_end, if the current
+    season's tables cannot be fetched or are empty, the seasons up to the previous year are used instead.
+
+    Args:
+    - n_seasons (int): Number of seasons to train on, counting the last one.
+    - season (int): Last season to train on. Defaults to the current season, with the fallback above.
+    - as_of (date): The date the current season's stats are as of. Defaults to today.
+    - refresh (bool): If True, ignore the cache and refetch every table.
+    - columns (dict): Optional mapping of table names to the columns to load, see fetch_table.
+
+    Returns:
+    - dict: Mapping of each season to its batting, pitching, fielding, and standings DataFrames. The last
+      season is the highest key.
+    """
+
+    as_of = as_of or date.today()
+    if season is not None or as_of >= date(as_of.year, *preseason_end):
+        season = season or as_of.year
+        return fetch_seasons(list(range(season - n_seasons + 1, season + 1)), as_of, refresh=refresh, columns=columns)
 
-    # Reorder columns to have 'Team_ID' as the first column
-    for df in [batting_data, pitching_data, fielding_data, standings_data]:
-        cols = list(df.columns)
-        cols.insert(0, cols.pop(cols.index('Team_ID')))
-        df = df[cols]
+    season = as_of.year
+    try:
+        season_tables = fetch_seasons(list(range(season - n_seasons + 1, season + 1)), as_of, refresh=refresh, columns=columns)
+        if not any(table.empty for table in season_tables[season]):
+            return season_tables
+        reason = "its tables are empty"
+    except Exception as e:
+        reason = str(e)
 
-    # Save data to CSV files
-    batting_data.to_csv('/data/batting_data.csv', index=False)
-    pitching_data.to_csv('/data/pitching_data.csv', index=False)
-    fielding_data.to_csv('/data/fielding_data.csv', index=False)
-    standings_data.to_csv('/data/standings_data.csv', index=False)
+    print(f"The {season} season has no stats yet ({reason}), training on the seasons up to {season - 1}")
+    return fetch_seasons(list(range(season - n_seasons, season)), as_of, refresh=refresh, columns=columns)
 
-    return batting_data, pitching_data, fielding_data, standings_data
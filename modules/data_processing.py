@@ -5,102 +5,375 @@ data_processing.py
 This module contains utility functions for processing and transforming data for the MLB betting application.
 
 Functions:
-- get_games_playing_today: Identify games that are scheduled for today.
-- load_and_preprocess_data: Load, merge, and preprocess the MLB data.
-- fetch_team_features: Fetch features for a specific team using its ID.
+- build_slate: Parse the API data once into a slate index grouped by local game date.
+- get_slate_games: Get the games on the slate for a given local date.
+- get_games_playing_today: Identify the teams that have games scheduled for today.
+- get_game_key: Get a stable key identifying a game.
+- build_odds_table: Flatten the bookmaker quotes of the games into a single columnar table.
+- load_and_preprocess_data: Load, align, and preprocess the MLB data.
+- assemble_seasons: Align the tables of several seasons and stack the complete team-seasons into one frame.
+- split_training_data: Split the aligned MLB data of the teams playing today into training and testing sets.
+- assemble_features: Align the four MLB statistics tables on a fixed Team_ID index in a single concatenation.
+- build_feature_matrix: Build a numeric feature matrix indexed by Team_ID with one row per team.
+- table_columns: List the unprefixed columns of a pybaseball table that project_columns keeps.
+- project_columns: Keep only the columns the model needs from a pybaseball table, prefixed and in compact dtypes.
+- load_projected_tables: Project the four pybaseball tables to the model's columns and report the memory saved.
 - prefix_columns: Add a prefix to all columns in a dataframe with an exception for 'Team_ID'.
 
 Imports:
-- Standard libraries: datetime, pandas
-- External libraries: sklearn.model_selection
+- Standard libraries: datetime
+- External libraries: pytz, numpy, pandas, sklearn.model_selection, modules.constants, modules.instrumentation
 """
 
 # Imports
 from datetime import datetime
+import pytz
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
+from modules.constants import slate_timezone, features, all_team_ids, team_name_columns, team_to_id, \
+    table_prefixes
+from modules.instrumentation import timed
 
 
-def get_games_playing_today(api_data, team_to_id):
+def build_slate(api_data, timezone=slate_timezone):
     """
-    Identify games that are scheduled for today based on the provided API data.
+    Parse the API data once into a slate index grouped by local game date.
+
+    Each game's UTC commence time is parsed a single time and converted to the slate timezone, so an
+    evening game that has already rolled over to the next day in UTC still belongs to its local date.
 
     Args:
     - api_data (list): List of games fetched from the API.
+    - timezone (str): Timezone used to decide which date a game is played on.
+
+    Returns:
+    - dict: Mapping of local game date to a list of games, each with an added timezone-aware 'start_time'.
+    """
+
+    tz = pytz.timezone(timezone)
+    slate = {}
+    for game in api_data:
+        commence_time = datetime.strptime(
+            game['commence_time'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=pytz.utc)
+        start_time = commence_time.astimezone(tz)
+        slate.setdefault(start_time.date(), []).append(
+            {**game, 'start_time': start_time})
+
+    for games in slate.values():
+        games.sort(key=lambda game: game['start_time'])
+
+    return slate
+
+
+def get_slate_games(slate, game_date=None, timezone=slate_timezone):
+    """
+    Get the games on the slate for a given local date.
+
+    Args:
+    - slate (dict): Slate index built by build_slate.
+    - game_date (date): Local date to look up. Defaults to today in the slate timezone.
+    - timezone (str): Timezone used to determine today's date.
+
+    Returns:
+    - list: Games scheduled for the date, ordered by start time.
+    """
+
+    if game_date is None:
+        game_date = datetime.now(pytz.timezone(timezone)).date()
+    return slate.get(game_date, [])
+
+
+def get_games_playing_today(slate, team_to_id, game_date=None):
+    """
+    Identify the teams that have games scheduled for today based on the slate index.
+
+    Teams missing from team_to_id are left out with a warning, and their games get no recommendation.
+
+    Args:
+    - slate (dict): Slate index built by build_slate.
     - team_to_id (dict): Dictionary mapping team names to their respective IDs.
+    - game_date (date): Local date to look up. Defaults to today in the slate timezone.
 
     Returns:
     - set: A set of team IDs that have games scheduled for today.
     """
 
     games_playing_today_ids = set()
-    current_date_utc = datetime.utcnow().date()
-    print(f"Current date in UTC: {current_date_utc}")
-    for game in api_data:
-        commence_time = datetime.strptime(
-            game['commence_time'], '%Y-%m-%dT%H:%M:%SZ')
-        commence_date_utc = commence_time.date()
-        print(
-            f"Commence time for {game['home_team']} vs {game['away_team']}: {commence_date_utc}")
-        if commence_date_utc == current_date_utc:
-            print(f"This game is considered a 'today's game'")
-            games_playing_today_ids.add(team_to_id[game['home_team']])
-            games_playing_today_ids.add(team_to_id[game['away_team']])
+    unmapped = set()
+    games_today = get_slate_games(slate, game_date)
+    for game in games_today:
+        for team_name in (game['home_team'], game['away_team']):
+            team_id = team_to_id.get(team_name)
+            if team_id is None:
+                unmapped.add(team_name)
+            else:
+                games_playing_today_ids.add(team_id)
 
+    if unmapped:
+        print(f"Warning: {len(unmapped)} teams have no Team_ID and were ignored: {', '.join(sorted(unmapped))}")
+    print(f"Found {len(games_today)} games scheduled for today")
     return games_playing_today_ids
 
 
-def load_and_preprocess_data(games_playing_today_ids, batting_data, pitching_data, fielding_data, standings_data):
+def get_game_key(game):
     """
-    Load, merge, and preprocess the MLB data. Then split the data into training and testing sets.
+    Get a stable key identifying a game.
+
+    Args:
+    - game (dict): Information about the game.
+
+    Returns:
+    - str: The Odds API game ID, or the teams and commence time if the game has no ID.
+    """
+
+    return game.get('id') or f"{game['away_team']}@{game['home_team']}@{game['commence_time']}"
+
+
+def build_odds_table(games):
+    """
+    Flatten the bookmaker quotes of the games into a single columnar table.
+
+    Args:
+    - games (list): Games fetched from the API or taken from the slate index.
+
+    Returns:
+    - DataFrame: One row per quote with game_id, home_team, away_team, bookmaker, market, outcome,
+      price (American odds), decimal_price and implied_prob columns.
+    """
+
+    rows = [
+        (get_game_key(game), game['home_team'], game['away_team'], bookmaker['title'],
+         market['key'], outcome['name'], outcome['price'])
+        for game in games
+        for bookmaker in game.get('bookmakers', [])
+        for market in bookmaker['markets']
+        for outcome in market['outcomes']
+    ]
+    odds_table = pd.DataFrame(rows, columns=[
+        'game_id', 'home_team', 'away_team', 'bookmaker', 'market', 'outcome', 'price'])
+
+    price = odds_table['price'].astype(float)
+    odds_table['decimal_price'] = np.where(
+        price > 0, 1 + price / 100, 1 + 100 / price.abs())
+    odds_table['implied_prob'] = 1 / odds_table['decimal_price']
+
+    return odds_table
+
+
+@timed()
+def load_and_preprocess_data(games_playing_today_ids, batting_data, pitching_data, fielding_data, standings_data,
+                             past_seasons=None):
+    """
+    Load, align, and preprocess the MLB data. Then split the data into training and testing sets.
 
     Args:
     - games_playing_today_ids (set): A set of team IDs that have games scheduled for today.
     - batting_data, pitching_data, fielding_data, standings_data (DataFrame): DataFrames containing MLB statistics.
+    - past_seasons (dict): Optional mapping of past seasons to their batting, pitching, fielding, and standings
+      DataFrames. Every team-season of these seasons is added to the training data.
+
+    Returns:
+    - Tuple: Training and testing datasets, and the Team_ID-indexed feature matrix of all teams.
+    """
+
+    # Align the batting, pitching, fielding, and standings data on the fixed Team_ID index in one pass
+    mlb_data = assemble_features(batting_data, pitching_data, fielding_data, standings_data)
+    past_data = assemble_seasons(past_seasons) if past_seasons else None
+    return split_training_data(mlb_data, games_playing_today_ids, past_data)
+
+
+def assemble_seasons(season_tables):
+    """
+    Align the tables of several seasons and stack the complete team-seasons into one frame.
+
+    Args:
+    - season_tables (dict): Mapping of seasons to their batting, pitching, fielding, and standings DataFrames.
 
     Returns:
-    - Tuple: Training and testing datasets.
+    - DataFrame: One row per team and season with data in every table, indexed by Team_ID, with a
+      'Season' column.
     """
 
-    # Merge the batting, pitching, and standings data on 'Team_ID'
-    mlb_data = pd.merge(batting_data, pitching_data, on='Team_ID')
-    mlb_data = pd.merge(mlb_data, fielding_data, on='Team_ID')
-    mlb_data = pd.merge(mlb_data, standings_data, on='Team_ID')
+    frames = []
+    for season, tables in sorted(season_tables.items()):
+        mlb_data = assemble_features(*tables)
+        frames.append(mlb_data[mlb_data['complete']].drop(columns='complete').assign(Season=season))
+    return pd.concat(frames)
+
 
-    # Print out the unique team IDs present in the resulting DataFrame
-    print("Unique Team IDs in Merged Data:", mlb_data['Team_ID'].unique())
+def split_training_data(mlb_data, games_playing_today_ids, past_data=None):
+    """
+    Split the aligned MLB data of the teams playing today into training and testing sets.
+
+    Args:
+    - mlb_data (DataFrame): Aligned MLB statistics, as returned by assemble_features.
+    - games_playing_today_ids (set): A set of team IDs that have games scheduled for today.
+    - past_data (DataFrame): Optional team-seasons of past seasons, as returned by assemble_seasons, to
+      train on alongside the teams playing today.
+
+    Returns:
+    - Tuple: Training and testing datasets, and the Team_ID-indexed feature matrix of all teams.
+    """
+
+    complete_teams = mlb_data.index[mlb_data['complete']]
+
+    # Print out the team IDs that have data in every source
+    print("Team IDs with complete data:", complete_teams.to_numpy())
 
     # Check if the pybaseball data is not empty
-    if mlb_data.empty:
+    if complete_teams.empty:
         raise Exception("The pybaseball data is empty.")
 
-    # Filter the mlb_data DataFrame to only include rows where the team ID is in games_playing_today_ids
-    mlb_data_today = mlb_data[mlb_data['Team_ID'].isin(
-        games_playing_today_ids)]
+    # Only include the teams with complete data whose team ID is in games_playing_today_ids
+    mlb_data_today = mlb_data.loc[complete_teams[complete_teams.isin(list(games_playing_today_ids))]]
 
     # Check if the filtered DataFrame is not empty
     if mlb_data_today.empty:
         raise Exception("The filtered DataFrame is empty.")
 
-    # Split the data into training and testing sets
-    train_data, test_data = train_test_split(mlb_data_today, test_size=0.2)
+    training_rows = mlb_data_today.drop(columns='complete')
+    if past_data is not None:
+        training_rows = pd.concat([past_data.drop(columns='Season'), training_rows])
+        print(f"Training on {len(training_rows)} team-seasons")
+
+    # Split the data into training and testing sets. The split is seeded so that unchanged data
+    # produces the same split and the stored model can be reused.
+    train_data, test_data = train_test_split(
+        training_rows.reset_index(), test_size=0.2, random_state=42)
+
+    return train_data, test_data, build_feature_matrix(mlb_data)
+
+
+def assemble_features(batting_data, pitching_data, fielding_data, standings_data, team_ids=all_team_ids):
+    """
+    Align the four MLB statistics tables on a fixed Team_ID index in a single concatenation.
+
+    Each table is indexed by Team_ID and reindexed to team_ids, then all four are joined side by side at
+    once instead of through successive merges. Rows without a Team_ID and teams missing from a table are
+    reported rather than silently dropped.
+
+    Args:
+    - batting_data, pitching_data, fielding_data, standings_data (DataFrame): Prefixed MLB statistics
+      tables with a 'Team_ID' column.
+    - team_ids (list): Team IDs the result should cover.
+
+    Returns:
+    - DataFrame: One row per team in team_ids, indexed by Team_ID, with the columns of all four tables and
+      a boolean 'complete' column that is False for teams missing from any table.
+    """
+
+    id_to_team = {team_id: team for team, team_id in team_to_id.items()}
+    sources = {'batting': batting_data, 'pitching': pitching_data, 'fielding': fielding_data,
+               'standings': standings_data}
+
+    aligned = []
+    complete = pd.Series(True, index=pd.Index(team_ids, name='Team_ID'))
+    for source, table in sources.items():
+        unmapped = table['Team_ID'].isna()
+        if unmapped.any():
+            print(f"Warning: {unmapped.sum()} {source} rows have no Team_ID and were ignored")
+            table = table[~unmapped]
+
+        table = table.drop_duplicates('Team_ID').set_index('Team_ID')
+        present = complete.index.isin(table.index)
+        if not present.all():
+            missing = [id_to_team.get(team_id, team_id) for team_id in complete.index[~present]]
+            print(f"Warning: {source} data is missing {len(missing)} teams: {', '.join(map(str, missing))}")
+        complete &= present
+        aligned.append(table.reindex(complete.index))
+
+    aligned.append(complete.rename('complete'))
+    return pd.concat(aligned, axis=1)
+
+
+def build_feature_matrix(mlb_data, team_ids=all_team_ids):
+    """
+    Build a numeric feature matrix indexed by Team_ID with one row per team.
+
+    The matrix covers every team in team_ids, in the exact order of the features list, so lookups do not
+    depend on which teams landed in the training split. Teams without data get a row of NaN values.
+
+    Args:
+    - mlb_data (DataFrame): MLB statistics indexed by Team_ID, as returned by assemble_features.
+    - team_ids (list): Team IDs the matrix should cover.
+
+    Returns:
+    - DataFrame: Float feature matrix indexed by Team_ID.
+    """
+
+    feature_matrix = mlb_data[features].apply(pd.to_numeric, errors='coerce').reindex(team_ids)
+    # Build from a single float array so the matrix is held in one contiguous block
+    return pd.DataFrame(feature_matrix.to_numpy(dtype=float), index=feature_matrix.index, columns=features)
+
+
+def table_columns(prefix):
+    """
+    List the unprefixed columns of a pybaseball table that project_columns keeps.
+
+    Args:
+    - prefix (str): Prefix of the table's features, e.g. 'bat_'.
+
+    Returns:
+    - list: 'Team_ID', the team name column and the statistics named in the features list.
+    """
+
+    wanted = [feature[len(prefix):] for feature in features if feature.startswith(prefix)]
+    if prefix == 'stand_':
+        wanted += [column for column in ('W', 'L') if column not in wanted]
+    return ['Team_ID', team_name_columns[prefix]] + wanted
 
-    return train_data, test_data
 
+def project_columns(dataframe, prefix):
+    """
+    Keep only the columns the model needs from a pybaseball table, prefixed and in compact dtypes.
+
+    The statistics named in the features list are coerced to float32 and the team name column to a
+    categorical, so the wide object-typed tables returned by pybaseball are not kept alive.
+
+    Args:
+    - dataframe (DataFrame): Unprefixed pybaseball table with a 'Team_ID' column.
+    - prefix (str): Prefix of the table's features, e.g. 'bat_'.
+
+    Returns:
+    - DataFrame: Projected table with prefixed column names and 'Team_ID' as the first column.
+    """
 
-def fetch_team_features(team_id, train_data):
+    wanted = table_columns(prefix)[2:]
+    numeric_columns = [column for column in wanted if column in dataframe.columns]
+
+    name_column = team_name_columns.get(prefix)
+    name_columns = [name_column] if name_column in dataframe.columns else []
+
+    projected = dataframe[['Team_ID'] + name_columns + numeric_columns].copy()
+    projected[numeric_columns] = projected[numeric_columns].apply(
+        pd.to_numeric, errors='coerce').astype('float32')
+    for column in name_columns:
+        projected[column] = projected[column].astype('category')
+
+    return prefix_columns(projected, prefix)
+
+
+def load_projected_tables(batting_data, pitching_data, fielding_data, standings_data):
     """
-    Fetch features for a specific team using its ID.
+    Project the four pybaseball tables to the model's columns and report the memory saved.
 
     Args:
-    - team_id (str): The ID of the team.
-    - train_data (DataFrame): Training data containing team features.
+    - batting_data, pitching_data, fielding_data, standings_data (DataFrame): Unprefixed pybaseball tables.
 
     Returns:
-    - DataFrame: Features of the specified team.
+    - Tuple: Projected and prefixed batting, pitching, fielding, and standings DataFrames.
     """
 
-    return train_data.loc[train_data['Team_ID'] == team_id]
+    tables = (batting_data, pitching_data, fielding_data, standings_data)
+    projected = tuple(project_columns(table, prefix) for table, prefix in zip(tables, table_prefixes.values()))
+
+    before = sum(table.memory_usage(deep=True).sum() for table in tables)
+    after = sum(table.memory_usage(deep=True).sum() for table in projected)
+    print(f"Projected pybaseball tables from {before / 1024:.1f}KB to {after / 1024:.1f}KB "
+          f"({(1 - after / before) * 100 if before else 0:.0f}% saved)")
+
+    return projected
 
 
 def prefix_columns(dataframe, prefix):
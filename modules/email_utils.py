@@ -5,262 +5,318 @@ email_utils.py
 This module contains utility functions related to email handling for the MLB betting application.
 
 Functions:
-- url_to_base64: Convert a PNG image from a URL into a base64 encoded string.
+- minify_css: Minify a stylesheet by removing comments and collapsing whitespace.
 - create_email_template: Construct an email template with the provided game details.
+- create_plaintext_body: Construct the plaintext alternative of the email.
 - send_email: Send an email with the game predictions and model evaluation metrics.
-- get_credentials: Load and refresh the Google OAuth2 credentials.
 
 Notes:
+- Delivery goes through the transport selected in modules/transport.py (Gmail API by default).
 - Ensure your Gmail API is authorized to send emails from your account from the cloud console.
 - Run 'quickstart.py' to generate a token in data/token.json.
 - If you get an error about the 'token.json' file not existing, delete the old token.json and run 'quickstart.py' again.
 
 Imports:
-- Standard libraries: datetime, os, base64, requests
-- External libraries: googleapiclient, google_auth_oauthlib, google.oauth2, email, pytz
+- Standard libraries: datetime, os, re, time, email
+- External libraries: modules.assets, modules.transport, modules.instrumentation
 """
 
 # Imports
 from datetime import datetime
 import os
-import base64
-import requests
-from io import BytesIO
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+import re
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-import pytz
+from email.mime.image import MIMEImage
+from email.utils import make_msgid
+from modules.assets import get_logos, logo_cid
+from modules.transport import get_transport
+from modules.instrumentation import timed
+
+
+# Stylesheet for the HTML email, minified once at import time
+EMAIL_CSS = """
+    body {
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        background-color: #f6f6f6;
+        padding: 20px;
+        margin: 0;
+    }
+    .container {
+        max-width: 600px;
+        margin: auto;
+        background-color: #fff;
+        border-radius: 10px;
+        overflow: hidden;
+        box-shadow: 0 0 15px rgba(0, 0, 0, 0.1);
+    }
+    .header {
+        background-color: #2E7D32;
+        color: #fff;
+        padding: 20px;
+        text-align: center;
+        font-size: 28px;
+        border-bottom: 3px solid #1B5E20;
+    }
+    .date {
+        text-align: center;
+        font-size: 18px;
+        color: #2E7D32;
+        padding: 10px;
+        background-color: #E8F5E9;
+    }
+    .game {
+        padding: 20px;
+        border-bottom: 1px solid #ECEFF1;
+    }
+    .game:last-child {
+        border-bottom: 0;
+    }
+    h2 {
+        margin-top: 0;
+        font-size: 22px;
+        color: #333;
+        border-bottom: 1px solid #ECEFF1;
+        padding-bottom: 10px;
+    }
+    .start-time {
+        font-size: 16px;
+        color: #555;
+        margin-bottom: 15px;
+        font-style: italic;
+    }
+    .recommendation {
+        font-size: 18px;
+        color: #008000;  /* Green color for recommendation */
+        margin-bottom: 15px;
+    }
+    .recommendation strong {
+        color: #333;
+        font-weight: bold;
+    }
+    .bookmaker-icon {
+        height: 25px;
+        width: 25px;
+        vertical-align: middle;
+        margin-right: 5px;
+    }
+    .bookmaker-label {
+        font-size: 18px;
+    }
+    .bookmaker-draftkings .bookmaker-label {
+        color: #008000;  /* Green color for DraftKings */
+    }
+    .bookmaker-fanduel .bookmaker-label {
+        color: #0000FF;  /* Blue color for FanDuel */
+    }
+    .bookmaker-barstool .bookmaker-label {
+        color: #FF0000;  /* Red color for Barstool Sportsbook */
+    }
+"""
+
+bookmaker_classes = {
+    "FanDuel": "bookmaker-fanduel",
+    "DraftKings": "bookmaker-draftkings",
+    "Barstool Sportsbook": "bookmaker-barstool"
+}
 
+# Gmail clips HTML bodies above ~102KB and rejects messages above 25MB
+GMAIL_CLIP_BYTES = 102 * 1024
+GMAIL_MAX_MESSAGE_BYTES = 25 * 1024 * 1024
 
-def url_to_base64(url):
+# Render time and sizes of the most recently rendered and sent email
+email_stats = {}
+
+
+def minify_css(css):
     """
-    Convert a PNG image from a URL into a base64 encoded string.
+    Minify a stylesheet by removing comments and collapsing whitespace.
 
     Args:
-    - url (str): URL of the PNG image.
+    - css (str): Stylesheet to minify.
 
     Returns:
-    - str: Base64 encoded representation of the PNG image.
+    - str: Minified stylesheet.
     """
 
-    response = requests.get(url)
-    image_data = BytesIO(response.content)
-    base64_encoded = base64.b64encode(image_data.read()).decode('utf-8')
-    return base64_encoded
-
-
-def create_email_template(games):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+_HTML_HEAD = (
+    '<html><head><style>' + minify_css(EMAIL_CSS) + '</style></head><body>'
+    '<div class="container"><div class="header">MLB Betting Lines</div>'
+)
+_HTML_DATE = '<div class="date">{date}</div>'
+_HTML_GAME_START = '<div class="game"><h2>{home_team} vs {away_team}</h2><div class="start-time">Start time: {start_time}</div>'
+_HTML_RECOMMENDATION = (
+    '<div class="recommendation {bookmaker_class}">Recommendation: <strong>{team} ({price}) at </strong>{icon}</div>'
+)
+_HTML_LOGO = '<img src="cid:{cid}" alt="{bookmaker} logo" width="50" height="50">'
+_HTML_BOOKMAKER_LABEL = '<span class="bookmaker-label">{bookmaker}</span>'
+_HTML_GAME_END = '</div>'
+_HTML_METRICS = (
+    '<div class="game"><h2>Model Evaluation Metrics</h2><p>Mean Absolute Error: {mae}</p>'
+    '<p>Mean Squared Error: {mse}</p><p>R-squared Score: {r2}</p></div>'
+)
+_HTML_FOOT = '</div></body></html>'
+
+_TEXT_HEAD = 'MLB Betting Lines\n{date}\n'
+_TEXT_GAME = '\n{home_team} vs {away_team}\nStart time: {start_time}\n'
+_TEXT_RECOMMENDATION = 'Recommendation: {team} ({price}) at {bookmaker}\n'
+_TEXT_METRICS = '\nModel Evaluation Metrics\nMean Absolute Error: {mae}\nMean Squared Error: {mse}\nR-squared Score: {r2}\n'
+
+
+def _format_start_time(game):
+    """Format the localized start time of a game for display."""
+    # Start time is already localized by the slate index
+    return game['start_time'].strftime('%B %d, %Y at %I:%M%p %Z')
+
+
+@timed()
+def create_email_template(games, mae=None, mse=None, r2=None, logos=None):
     """
     Construct an email template with the provided game details.
 
+    The HTML is assembled from precompiled fragments. Bookmaker logos are referenced by Content-ID, so each
+    logo is attached to the message only once. The render time and HTML size are recorded in email_stats.
+
     Args:
-    - games (list): List of games with details.
+    - games (list): List of games with details, as returned by parse_data.
+    - mae (float): Mean Absolute Error metric. The metrics section is left out if not given.
+    - mse (float): Mean Squared Error metric.
+    - r2 (float): R-squared Score metric.
+    - logos (dict): Mapping of bookmaker names to PNG bytes. Defaults to the preloaded logo cache.
 
     Returns:
     - str: HTML content for the email.
     """
 
-    email_body = f"""
-    <html>
-    <head>
-        <style>
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background-color: #f6f6f6;
-                padding: 20px;
-                margin: 0;
-            }}
-            .container {{
-                max-width: 600px;
-                margin: auto;
-                background-color: #fff;
-                border-radius: 10px;
-                overflow: hidden;
-                box-shadow: 0 0 15px rgba(0, 0, 0, 0.1);
-            }}
-            .header {{
-                background-color: #2E7D32;
-                color: #fff;
-                padding: 20px;
-                text-align: center;
-                font-size: 28px;
-                border-bottom: 3px solid #1B5E20;
-            }}
-            .date {{
-                text-align: center;
-                font-size: 18px;
-                color: #2E7D32;
-                padding: 10px;
-                background-color: #E8F5E9;
-            }}
-            .game {{
-                padding: 20px;
-                border-bottom: 1px solid #ECEFF1;
-            }}
-            .game:last-child {{
-                border-bottom: 0;
-            }}
-            h2 {{
-                margin-top: 0;
-                font-size: 22px;
-                color: #333;
-                border-bottom: 1px solid #ECEFF1;
-                padding-bottom: 10px;
-            }}
-            .start-time {{
-                font-size: 16px;
-                color: #555;
-                margin-bottom: 15px;
-                font-style: italic;
-            }}
-            .recommendation {{
-                font-size: 18px;
-                color: #008000;  /* Green color for recommendation */
-                margin-bottom: 15px;
-            }}
-            .recommendation strong {{
-                color: #333;
-                font-weight: bold;
-            }}
-            .bookmaker-icon {{
-                height: 25px;
-                width: 25px;
-                vertical-align: middle;
-                margin-right: 5px;
-            }}
-            .bookmaker-label {{
-                font-size: 18px;
-            }}
-            .bookmaker-draftkings .bookmaker-label {{
-                color: #008000;  /* Green color for DraftKings */
-            }}
-            .bookmaker-fanduel .bookmaker-label {{
-                color: #0000FF;  /* Blue color for FanDuel */
-            }}
-            .bookmaker-barstool .bookmaker-label {{
-                color: #FF0000;  /* Red color for Barstool Sportsbook */
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">MLB Betting Lines</div>
-            <div class="date">{datetime.now().strftime('%B %d, %Y')}</div>
-    """
-
-    bookmaker_classes = {
-        "FanDuel": "bookmaker-fanduel",
-        "DraftKings": "bookmaker-draftkings",
-        "Barstool Sportsbook": "bookmaker-barstool"
-    }
-
-    bookmaker_icon_urls = {
-        "FanDuel": "https://s3.amazonaws.com/rical-misc/FanDuel-vertical-logo.png",
-        "DraftKings": "https://companieslogo.com/img/orig/DKNG-e9ded183.png?t=1660587881",
-        "Barstool Sportsbook": "https://www.pinclipart.com/picdir/big/36-361767_chicago-transparent-barstool-sports-clip-art-royalty-barstool.png",
-    }
+    start = time.perf_counter()
+    logos = get_logos() if logos is None else logos
 
+    fragments = [_HTML_HEAD, _HTML_DATE.format(date=datetime.now().strftime('%B %d, %Y'))]
     for game in games:
-        commence_time = datetime.strptime(
-            game['commence_time'], '%Y-%m-%dT%H:%M:%SZ')
-        commence_time = commence_time.replace(tzinfo=pytz.utc).astimezone(
-            pytz.timezone('America/New_York'))  # Convert to EST/EDT
-        # Format time to human-readable here
-        commence_time = commence_time.strftime('%B %d, %Y at %I:%M%p EST')
-        email_body += f"""
-        <div class="game">
-            <h2>{game['home_team']} vs {game['away_team']}</h2>
-            <div class="start-time">Start time: {commence_time}</div>
-        """
+        fragments.append(_HTML_GAME_START.format(
+            home_team=game['home_team'], away_team=game['away_team'], start_time=_format_start_time(game)))
+
         rec = game.get('recommendation')
         if rec and isinstance(rec, dict):
             bookmaker_name = rec.get('bookmaker', "")
-            bookmaker_class = bookmaker_classes.get(bookmaker_name, "")
-            bookmaker_icon_data = url_to_base64(
-                bookmaker_icon_urls.get(bookmaker_name, ""))
-            email_body += f"""
-            <div class="recommendation">
-                Recommendation: <strong>{rec.get('team', 'N/A')} ({rec.get('price', 'N/A')}) at </strong>
-                <img src="data:image/png;base64,{bookmaker_icon_data}" alt="{bookmaker_name} logo" width="50" height="50">
-            </div>
-            """
-        email_body += "</div>"
-
-    email_body += """
-        </div>
-    </body>
-    </html>
-    """
+            # Logos are attached once by send_email and referenced here by Content-ID
+            if bookmaker_name in logos:
+                icon = _HTML_LOGO.format(cid=logo_cid(bookmaker_name), bookmaker=bookmaker_name)
+            else:
+                icon = _HTML_BOOKMAKER_LABEL.format(bookmaker=bookmaker_name)
+            fragments.append(_HTML_RECOMMENDATION.format(
+                bookmaker_class=bookmaker_classes.get(bookmaker_name, ""), team=rec.get('team', 'N/A'),
+                price=rec.get('price', 'N/A'), icon=icon))
+
+        fragments.append(_HTML_GAME_END)
+
+    if mae is not None:
+        fragments.append(_HTML_METRICS.format(mae=mae, mse=mse, r2=r2))
+    fragments.append(_HTML_FOOT)
+
+    email_body = ''.join(fragments)
+    email_stats['render_seconds'] = time.perf_counter() - start
+    email_stats['html_bytes'] = len(email_body.encode('utf-8'))
     return email_body
 
 
-def send_email(mae, mse, r2, email_body):
+def create_plaintext_body(games, mae=None, mse=None, r2=None):
     """
-    Send an email with game predictions and model evaluation metrics.
+    Construct the plaintext alternative of the email.
 
     Args:
-    - mae (float): Mean Absolute Error metric.
+    - games (list): List of games with details, as returned by parse_data.
+    - mae (float): Mean Absolute Error metric. The metrics section is left out if not given.
     - mse (float): Mean Squared Error metric.
     - r2 (float): R-squared Score metric.
-    - email_body (str): Email body content.
 
     Returns:
-    - None: Sends the email and prints a confirmation message.
+    - str: Plaintext content for the email.
     """
 
-    creds = get_credentials()
-    service = build('gmail', 'v1', credentials=creds)
+    fragments = [_TEXT_HEAD.format(date=datetime.now().strftime('%B %d, %Y'))]
+    for game in games:
+        fragments.append(_TEXT_GAME.format(
+            home_team=game['home_team'], away_team=game['away_team'], start_time=_format_start_time(game)))
 
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = f"MLB Moneyline Predictions for {datetime.now().strftime('%B %d, %Y')}"
-    msg["From"] = os.getenv("BET_EMAIL")
-    msg["To"] = os.getenv("RECIPENT_EMAIL")
-
-    # Added model evaluation metrics to the email body
-    email_body += f"""
-    <h2>Model Evaluation Metrics</h2>
-    <p>Mean Absolute Error: {mae}</p>
-    <p>Mean Squared Error: {mse}</p>
-    <p>R-squared Score: {r2}</p>
-    """
+        rec = game.get('recommendation')
+        if rec and isinstance(rec, dict):
+            fragments.append(_TEXT_RECOMMENDATION.format(
+                team=rec.get('team', 'N/A'), price=rec.get('price', 'N/A'), bookmaker=rec.get('bookmaker', 'N/A')))
 
-    # Create the email body with predictions and evaluation metrics
-    msg.attach(MIMEText(email_body, "html"))
+    if mae is not None:
+        fragments.append(_TEXT_METRICS.format(mae=mae, mse=mse, r2=r2))
 
-    create_message = {'raw': base64.urlsafe_b64encode(msg.as_bytes()).decode()}
-    send_message = (service.users().messages().send(
-        userId="me", body=create_message).execute())
-    print(F'Sent message to {msg["To"]} Message Id: {send_message["id"]}')
+    return ''.join(fragments)
 
 
-def get_credentials():
+@timed()
+def send_email(email_body, text_body=None, logos=None, transport=None, recipients=None):
     """
-    Load and refresh the Google OAuth2 credentials.
+    Send an email with game predictions and model evaluation metrics.
+
+    The message is built once and delivered to each recipient through the same transport, so the connection
+    and credentials are reused. The final message size is recorded in email_stats, and a warning is printed
+    if the message is close to Gmail's limits.
 
     Args:
-    - None
+    - email_body (str): HTML email body, as returned by create_email_template.
+    - text_body (str): Plaintext alternative, as returned by create_plaintext_body.
+    - logos (dict): Mapping of bookmaker names to PNG bytes. Defaults to the preloaded logo cache.
+    - transport (EmailTransport): Transport to deliver with. Defaults to the shared transport.
+    - recipients (list): Email addresses to send to. Defaults to the comma-separated RECIPIENT_EMAIL variable.
 
     Returns:
-    - creds (Credentials): Loaded or refreshed Google OAuth2 credentials.
+    - None: Sends the email and prints a confirmation message. Raises an exception if there are no recipients.
     """
 
-    creds = None
-    if os.path.exists("data/token.json"):
-        creds = Credentials.from_authorized_user_file("data/token.json")
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "data/credentials.json", [
-                    "https://www.googleapis.com/auth/gmail.send"]
-            )
-            creds = flow.run_local_server(port=0)
-        with open("data/token.json", "w") as token:
-            token.write(creds.to_json())
-
-    return creds
+    transport = transport or get_transport()
+    logos = get_logos() if logos is None else logos
+    if recipients is None:
+        recipients = [address.strip() for address in
+                      (os.getenv("RECIPIENT_EMAIL") or os.getenv("RECIPENT_EMAIL") or "").split(",") if address.strip()]
+    if not recipients:
+        raise Exception("No email recipients. Set RECIPIENT_EMAIL to one or more comma-separated addresses.")
+
+    msg = MIMEMultipart("related")
+    msg["Subject"] = f"MLB Moneyline Predictions for {datetime.now().strftime('%B %d, %Y')}"
+    msg["From"] = os.getenv("BET_EMAIL")
+
+    # Create the email body with the plaintext part first, so clients prefer the HTML part
+    alternative = MIMEMultipart("alternative")
+    if text_body:
+        alternative.attach(MIMEText(text_body, "plain"))
+    alternative.attach(MIMEText(email_body, "html"))
+    msg.attach(alternative)
+
+    # Attach each referenced logo once as an inline image
+    for bookmaker_name, logo in logos.items():
+        cid = logo_cid(bookmaker_name)
+        if f"cid:{cid}" in email_body:
+            image = MIMEImage(logo, "png")
+            image.add_header("Content-ID", f"<{cid}>")
+            image.add_header("Content-Disposition", "inline", filename=f"{cid}.png")
+            msg.attach(image)
+
+    raw_message = msg.as_bytes()
+    email_stats['message_bytes'] = len(raw_message)
+    print(f"Email size: {len(raw_message) / 1024:.1f}KB (HTML {email_stats.get('html_bytes', 0) / 1024:.1f}KB)")
+    if email_stats.get('html_bytes', 0) > GMAIL_CLIP_BYTES:
+        print("Warning: the HTML body is larger than Gmail's clipping limit")
+    if len(raw_message) > GMAIL_MAX_MESSAGE_BYTES * 0.8:
+        print("Warning: the email is close to Gmail's message size limit")
+
+    for recipient in recipients:
+        del msg["To"]
+        del msg["Message-ID"]
+        msg["To"] = recipient
+        msg["Message-ID"] = make_msgid()
+        message_id = transport.send(msg)
+        print(F'Sent message to {recipient} Message Id: {message_id}')
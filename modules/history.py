@@ -0,0 +1,413 @@
+"""
+history.py
+----------
+
+This module keeps an append-only history of the recommendations and the odds snapshots of every run in a
+SQLite database, so past picks can be evaluated over a whole season. Rows are only ever inserted, in one
+transaction per run, and the tables are indexed by date, team and bookmaker so that the performance
+queries are answered by SQLite without loading the history into memory.
+
+The recommendation that counts for a game is the last one recorded before it started. The closing line of
+a pick is the last snapshot of the same team at the same bookmaker taken before the game started.
+
+Functions:
+- connect: Open the history database, creating the tables and indexes if needed.
+- record_recommendations: Append the recommendations of a run to the history.
+- record_odds_snapshot: Append every bookmaker quote of the fetched games to the history.
+- record_results: Record the winners of finished games.
+- get_performance: Compute the number of bets, hit rate, profit and ROI of the recorded picks.
+- get_closing_line_value: Compare the prices of the recorded picks to their closing lines.
+- get_snapshot_dates: List the game dates that have archived odds snapshots.
+- load_snapshot_games: Rebuild the games of a date from the last odds snapshot taken before each game.
+- load_results: Load the winners of the recorded games.
+
+Imports:
+- Standard libraries: os, sqlite3, datetime
+- External libraries: modules.constants, modules.data_processing, modules.recommendation
+"""
+
+import os
+import sqlite3
+from datetime import date, datetime, timezone
+from modules.constants import history_db_path
+from modules.data_processing import get_game_key, build_odds_table
+from modules.recommendation import decimal_odds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    run_at TEXT NOT NULL,
+    game_date TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    commence_time TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    team TEXT NOT NULL,
+    bookmaker TEXT,
+    price REAL,
+    decimal_price REAL,
+    predicted_win_pct REAL,
+    expected_value REAL,
+    model_fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS recommendations_date ON recommendations (game_date);
+CREATE INDEX IF NOT EXISTS recommendations_team ON recommendations (team, game_date);
+CREATE INDEX IF NOT EXISTS recommendations_bookmaker ON recommendations (bookmaker, game_date);
+CREATE INDEX IF NOT EXISTS recommendations_game ON recommendations (game_id, run_at);
+
+CREATE TABLE IF NOT EXISTS odds_snapshots (
+    fetched_at TEXT NOT NULL,
+    game_date TEXT NOT NULL,
+    game_id TEXT NOT NULL,
+    commence_time TEXT NOT NULL,
+    home_team TEXT NOT NULL,
+    away_team TEXT NOT NULL,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    price REAL NOT NULL,
+    decimal_price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS odds_snapshots_date ON odds_snapshots (game_date);
+CREATE INDEX IF NOT EXISTS odds_snapshots_quote ON odds_snapshots (game_id, bookmaker, outcome, fetched_at);
+
+CREATE TABLE IF NOT EXISTS game_results (
+    game_id TEXT PRIMARY KEY,
+    game_date TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    home_score INTEGER,
+    away_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS game_results_date ON game_results (game_date);
+
+CREATE VIEW IF NOT EXISTS final_recommendations AS
+SELECT r.* FROM recommendations r
+WHERE r.run_at <= r.commence_time
+  AND r.rowid = (SELECT latest.rowid FROM recommendations latest
+                 WHERE latest.game_id = r.game_id AND latest.run_at <= latest.commence_time
+                 ORDER BY latest.run_at DESC, latest.rowid DESC LIMIT 1);
+"""
+
+# Columns the performance figures can be grouped by
+_GROUP_COLUMNS = {'team': 'f.team', 'bookmaker': 'f.bookmaker', 'game_date': 'f.game_date'}
+
+
+def _utc_timestamp(moment=None):
+    """Format a datetime, by default the current time, like The Odds API commence times."""
+    moment = moment or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _game_date(game):
+    """Return the local game date of a game as an ISO string."""
+    start_time = game.get('start_time')
+    return start_time.date().isoformat() if start_time else game['commence_time'][:10]
+
+
+def _date_filter(start_date, end_date, column):
+    """Build the WHERE clause and parameters restricting a column to a date range."""
+    clauses, params = [], []
+    if start_date:
+        clauses.append(f"{column} >= ?")
+        params.append(str(start_date))
+    if end_date:
+        clauses.append(f"{column} <= ?")
+        params.append(str(end_date))
+    return (" AND ".join(clauses) or "1"), params
+
+
+def connect(path=history_db_path):
+    """
+    Open the history database, creating the tables and indexes if needed.
+
+    Args:
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - Connection: Open connection to the database.
+    """
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    # WAL lets the queries read the history while a run appends to it
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def record_recommendations(games, model_fingerprint=None, run_at=None, path=history_db_path):
+    """
+    Append the recommendations of a run to the history.
+
+    Args:
+    - games (list): Games with recommendations, as returned by parse_data.
+    - model_fingerprint (str): Fingerprint of the model that made the recommendations.
+    - run_at (datetime): Time of the run. Defaults to now.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - int: Number of recommendations recorded.
+    """
+
+    run_at = _utc_timestamp(run_at)
+    rows = []
+    for game in games:
+        recommendation = game.get('recommendation')
+        if not recommendation:
+            continue
+        price = recommendation.get('price')
+        rows.append((
+            run_at, _game_date(game), game.get('game_id') or get_game_key(game), game['commence_time'],
+            game['home_team'], game['away_team'], recommendation['team'], recommendation.get('bookmaker'),
+            price, decimal_odds(price) if price else None, recommendation.get('predicted_win_pct'),
+            recommendation.get('expected_value'), model_fingerprint,
+        ))
+
+    connection = connect(path)
+    try:
+        with connection:
+            connection.executemany(
+                "INSERT INTO recommendations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    finally:
+        connection.close()
+
+    return len(rows)
+
+
+def record_odds_snapshot(games, fetched_at=None, path=history_db_path):
+    """
+    Append every bookmaker quote of the fetched games to the history.
+
+    The snapshots are what the closing line of a pick is looked up from.
+
+    Args:
+    - games (list): Games from the slate index, with their bookmaker quotes.
+    - fetched_at (datetime): Time the odds were fetched. Defaults to now.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - int: Number of quotes recorded.
+    """
+
+    fetched_at = _utc_timestamp(fetched_at)
+    game_info = {get_game_key(game): (_game_date(game), game['commence_time']) for game in games}
+    odds_table = build_odds_table(games)
+    rows = [
+        (fetched_at, *game_info[game_id], game_id, home_team, away_team, bookmaker, market, outcome,
+         float(price), float(decimal_price))
+        for game_id, home_team, away_team, bookmaker, market, outcome, price, decimal_price in zip(
+            odds_table['game_id'], odds_table['home_team'], odds_table['away_team'], odds_table['bookmaker'],
+            odds_table['market'], odds_table['outcome'], odds_table['price'], odds_table['decimal_price'])
+    ]
+
+    connection = connect(path)
+    try:
+        with connection:
+            connection.executemany(
+                "INSERT INTO odds_snapshots (fetched_at, game_date, commence_time, game_id, home_team, "
+                "away_team, bookmaker, market, outcome, price, decimal_price) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    finally:
+        connection.close()
+
+    return len(rows)
+
+
+def record_results(results, path=history_db_path):
+    """
+    Record the winners of finished games.
+
+    Recording a game again replaces its result, for example after a correction.
+
+    Args:
+    - results (list): Dictionaries with 'game_id', 'game_date' and 'winner' keys, and optionally
+      'home_score' and 'away_score'.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - int: Number of results recorded.
+    """
+
+    rows = [(result['game_id'], str(result['game_date']), result['winner'], result.get('home_score'),
+             result.get('away_score')) for result in results]
+
+    connection = connect(path)
+    try:
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO game_results VALUES (?, ?, ?, ?, ?)", rows)
+    finally:
+        connection.close()
+
+    return len(rows)
+
+
+def get_performance(start_date=None, end_date=None, group_by=None, path=history_db_path):
+    """
+    Compute the number of bets, hit rate, profit and ROI of the recorded picks.
+
+    Only the final pick of each game with a recorded result is counted. Profit is in units of one unit
+    staked per pick.
+
+    Args:
+    - start_date (date): First game date to include. Defaults to the start of the history.
+    - end_date (date): Last game date to include. Defaults to the end of the history.
+    - group_by (str): 'team', 'bookmaker' or 'game_date' to break the figures down, or None for totals.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - list: Dictionaries with 'group', 'bets', 'wins', 'hit_rate', 'profit' and 'roi' keys.
+    """
+
+    if group_by is not None and group_by not in _GROUP_COLUMNS:
+        raise Exception(f"Cannot group performance by '{group_by}'. Choose from: {', '.join(_GROUP_COLUMNS)}")
+
+    group_column = _GROUP_COLUMNS.get(group_by, "'all'")
+    where, params = _date_filter(start_date, end_date, 'f.game_date')
+    query = f"""
+        SELECT {group_column} AS "group", COUNT(*) AS bets, SUM(res.winner = f.team) AS wins,
+               SUM(CASE WHEN res.winner = f.team THEN f.decimal_price - 1 ELSE -1 END) AS profit
+        FROM final_recommendations f
+        JOIN game_results res ON res.game_id = f.game_id
+        WHERE {where}
+        GROUP BY 1
+        ORDER BY 1
+    """
+
+    connection = connect(path)
+    try:
+        rows = connection.execute(query, params).fetchall()
+    finally:
+        connection.close()
+
+    return [{'group': row['group'], 'bets': row['bets'], 'wins': row['wins'], 'hit_rate': row['wins'] / row['bets'],
+             'profit': row['profit'], 'roi': row['profit'] / row['bets']} for row in rows]
+
+
+def get_closing_line_value(start_date=None, end_date=None, path=history_db_path):
+    """
+    Compare the prices of the recorded picks to their closing lines.
+
+    Args:
+    - start_date (date): First game date to include. Defaults to the start of the history.
+    - end_date (date): Last game date to include. Defaults to the end of the history.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - dict: Number of picks with a closing line, the average closing line value (decimal price over
+      closing decimal price, minus one) and the share of picks that beat the closing line.
+    """
+
+    where, params = _date_filter(start_date, end_date, 'f.game_date')
+    query = f"""
+        SELECT COUNT(*) AS bets, AVG(decimal_price / closing_price - 1) AS clv,
+               AVG(decimal_price > closing_price) AS beat_close_rate
+        FROM (
+            SELECT f.decimal_price,
+                   (SELECT s.decimal_price FROM odds_snapshots s
+                    WHERE s.game_id = f.game_id AND s.bookmaker = f.bookmaker AND s.outcome = f.team
+                      AND s.market = 'h2h' AND s.fetched_at <= f.commence_time
+                    ORDER BY s.fetched_at DESC LIMIT 1) AS closing_price
+            FROM final_recommendations f
+            WHERE {where}
+        )
+        WHERE closing_price IS NOT NULL
+    """
+
+    connection = connect(path)
+    try:
+        row = connection.execute(query, params).fetchone()
+    finally:
+        connection.close()
+
+    return {'bets': row['bets'], 'clv': row['clv'], 'beat_close_rate': row['beat_close_rate']}
+
+
+def get_snapshot_dates(start_date=None, end_date=None, path=history_db_path):
+    """
+    List the game dates that have archived odds snapshots.
+
+    Args:
+    - start_date (date): First game date to include.
+    - end_date (date): Last game date to include.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - list: Game dates in ascending order.
+    """
+
+    where, params = _date_filter(start_date, end_date, 'game_date')
+    connection = connect(path)
+    try:
+        rows = connection.execute(
+            f"SELECT DISTINCT game_date FROM odds_snapshots WHERE {where} ORDER BY game_date", params).fetchall()
+    finally:
+        connection.close()
+
+    return [date.fromisoformat(row['game_date']) for row in rows]
+
+
+def load_snapshot_games(game_date, path=history_db_path):
+    """
+    Rebuild the games of a date from the last odds snapshot taken before each game.
+
+    Args:
+    - game_date (date): Local game date.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - list: Games in the format returned by The Odds API.
+    """
+
+    query = """
+        SELECT s.game_id, s.commence_time, s.home_team, s.away_team, s.bookmaker, s.market, s.outcome, s.price
+        FROM odds_snapshots s
+        WHERE s.game_date = ? AND s.fetched_at = (
+            SELECT MAX(latest.fetched_at) FROM odds_snapshots latest
+            WHERE latest.game_id = s.game_id AND latest.bookmaker = s.bookmaker AND latest.outcome = s.outcome
+              AND latest.market = s.market AND latest.fetched_at <= latest.commence_time)
+        ORDER BY s.commence_time, s.game_id, s.bookmaker, s.market
+    """
+
+    connection = connect(path)
+    try:
+        rows = connection.execute(query, (str(game_date),)).fetchall()
+    finally:
+        connection.close()
+
+    games = {}
+    for row in rows:
+        game = games.setdefault(row['game_id'], {
+            'id': row['game_id'], 'commence_time': row['commence_time'], 'home_team': row['home_team'],
+            'away_team': row['away_team'], 'bookmakers': {}})
+        bookmaker = game['bookmakers'].setdefault(row['bookmaker'], {
+            'key': row['bookmaker'].lower().replace(' ', ''), 'title': row['bookmaker'], 'markets': {}})
+        market = bookmaker['markets'].setdefault(row['market'], {'key': row['market'], 'outcomes': []})
+        market['outcomes'].append({'name': row['outcome'], 'price': row['price']})
+
+    for game in games.values():
+        game['bookmakers'] = [{**bookmaker, 'markets': list(bookmaker['markets'].values())}
+                              for bookmaker in game['bookmakers'].values()]
+    return list(games.values())
+
+
+def load_results(start_date=None, end_date=None, path=history_db_path):
+    """
+    Load the winners of the recorded games.
+
+    Args:
+    - start_date (date): First game date to include.
+    - end_date (date): Last game date to include.
+    - path (str): Path of the SQLite database.
+
+    Returns:
+    - dict: Mapping of game IDs to the name of the winning team.
+    """
+
+    where, params = _date_filter(start_date, end_date, 'game_date')
+    connection = connect(path)
+    try:
+        rows = connection.execute(f"SELECT game_id, winner FROM game_results WHERE {where}", params).fetchall()
+    finally:
+        connection.close()
+
+    return {row['game_id']: row['winner'] for row in rows}
@@ -0,0 +1,84 @@
+"""
+importance.py
+-------------
+
+This module computes permutation feature importance for the trained model as a separate, optional stage.
+Features are permuted in parallel, and the results are stored next to the model under its fingerprint, so
+an unchanged model reuses them instead of recomputing.
+
+Functions:
+- compute_feature_importance: Compute or load the permutation importance of every feature.
+- format_importance: Format the most important features for the console.
+
+Imports:
+- Standard libraries: os, json
+- External libraries: sklearn.inspection, modules.constants, modules.cache
+"""
+
+import os
+import json
+from sklearn.inspection import permutation_importance
+from modules.constants import model_store_dir
+from modules.cache import atomic_write
+
+
+def _importance_path(fingerprint, directory):
+    """Build the path of the stored importance results for a model fingerprint."""
+    return os.path.join(directory, f"{fingerprint}.importance.json")
+
+
+def compute_feature_importance(model, X_test, y_test, fingerprint=None, n_repeats=10, directory=model_store_dir):
+    """
+    Compute or load the permutation importance of every feature.
+
+    Args:
+    - model (RandomForestRegressor): The trained model.
+    - X_test (DataFrame): Testing feature data.
+    - y_test (Series): Testing target.
+    - fingerprint (str): Model fingerprint used to cache the results. Results are not cached if None.
+    - n_repeats (int): Number of times each feature is permuted.
+    - directory (str): Directory holding the stored results.
+
+    Returns:
+    - list: Dictionaries with 'feature', 'importance_mean' and 'importance_std' keys, most important first.
+    """
+
+    path = _importance_path(fingerprint, directory) if fingerprint else None
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    # n_jobs=-1 permutes the features in parallel
+    result = permutation_importance(model, X_test, y_test, n_repeats=n_repeats, random_state=1, n_jobs=-1,
+                                    scoring='neg_mean_squared_error')
+    importances = sorted(
+        [{'feature': feature, 'importance_mean': float(mean), 'importance_std': float(std)}
+         for feature, mean, std in zip(X_test.columns, result.importances_mean, result.importances_std)],
+        key=lambda importance: importance['importance_mean'], reverse=True)
+
+    if path:
+        os.makedirs(directory, exist_ok=True)
+
+        def write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(importances, f, indent=4)
+
+        atomic_write(path, write)
+
+    return importances
+
+
+def format_importance(importances, top=10):
+    """
+    Format the most important features for the console.
+
+    Args:
+    - importances (list): Results of compute_feature_importance.
+    - top (int): Number of features to include.
+
+    Returns:
+    - str: One line per feature with its mean importance and standard deviation.
+    """
+
+    return "\n".join(f"{importance['feature']:<16} {importance['importance_mean']:.5f} +/- {importance['importance_std']:.5f}"
+                     for importance in importances[:top])
@@ -0,0 +1,163 @@
+"""
+instrumentation.py
+------------------
+
+This module records timing and memory spans for the stages of the MLB betting application.
+Each span records wall time, process CPU time and the process peak resident set size, and the spans of a
+run can be written to a JSON report and printed as a summary table.
+
+Functions:
+- span: Context manager that records a span around a block of code.
+- timed: Decorator that records a span around every call of a function.
+- get_spans: Return a copy of the spans recorded so far.
+- reset_spans: Discard the spans recorded so far.
+- write_run_report: Write the recorded spans to a JSON run report.
+- format_summary: Format the recorded spans as a summary table.
+
+Imports:
+- Standard libraries: os, sys, json, time, threading, functools, contextlib, datetime, resource
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # resource is not available on Windows
+    resource = None
+
+_spans = []
+_spans_lock = threading.Lock()
+
+
+def _peak_rss_mb():
+    """Return the peak resident set size of the process in megabytes, or None if it is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+@contextmanager
+def span(name):
+    """
+    Context manager that records a span around a block of code.
+
+    CPU time is measured for the whole process, so it includes work done by other threads while the span
+    is open. Peak RSS is the process high-water mark when the span ends.
+
+    Args:
+    - name (str): Name of the span.
+
+    Yields:
+    - dict: The span record, which the block may extend with extra fields.
+    """
+
+    record = {'name': name, 'started_at': datetime.now().isoformat(timespec='seconds'), 'status': 'ok'}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    rss_start = _peak_rss_mb()
+    try:
+        yield record
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['wall_seconds'] = time.perf_counter() - wall_start
+        record['cpu_seconds'] = time.process_time() - cpu_start
+        record['peak_rss_mb'] = _peak_rss_mb()
+        if rss_start is not None:
+            record['peak_rss_growth_mb'] = record['peak_rss_mb'] - rss_start
+        with _spans_lock:
+            _spans.append(record)
+
+
+def timed(name=None):
+    """
+    Decorator that records a span around every call of a function.
+
+    Args:
+    - name (str): Name of the span. Defaults to the function name.
+
+    Returns:
+    - callable: The decorator.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def get_spans():
+    """
+    Return a copy of the spans recorded so far.
+
+    Returns:
+    - list: Span records in the order they finished.
+    """
+
+    with _spans_lock:
+        return list(_spans)
+
+
+def reset_spans():
+    """Discard the spans recorded so far."""
+    with _spans_lock:
+        _spans.clear()
+
+
+def write_run_report(path='data/run_report.json', extra=None):
+    """
+    Write the recorded spans to a JSON run report.
+
+    Args:
+    - path (str): Path of the report file.
+    - extra (dict): Additional top-level fields to include in the report.
+
+    Returns:
+    - str: Path of the written report.
+    """
+
+    report = {'generated_at': datetime.now().isoformat(timespec='seconds'), 'spans': get_spans()}
+    report.update(extra or {})
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=4, default=str)
+    return path
+
+
+def format_summary(spans=None):
+    """
+    Format the recorded spans as a summary table.
+
+    Args:
+    - spans (list): Span records to format. Defaults to the spans recorded so far.
+
+    Returns:
+    - str: Table with one row per span.
+    """
+
+    spans = get_spans() if spans is None else spans
+    name_width = max([len(record['name']) for record in spans] + [len('Stage')])
+
+    lines = [f"{'Stage':<{name_width}}  {'Wall (s)':>9}  {'CPU (s)':>9}  {'Peak RSS (MB)':>13}  Status"]
+    for record in spans:
+        peak = record.get('peak_rss_mb')
+        peak = f"{peak:.1f}" if peak is not None else "n/a"
+        lines.append(f"{record['name']:<{name_width}}  {record['wall_seconds']:>9.2f}  "
+                     f"{record['cpu_seconds']:>9.2f}  {peak:>13}  {record['status']}")
+    return "\n".join(lines)
@@ -0,0 +1,141 @@
+"""
+matchups.py
+-----------
+
+This module turns the model's predicted win percentages into head-to-head win probabilities for every pair
+of teams. All 30 teams are predicted in one batch after training and combined with the log5 formula in a
+single vectorized pass, and the resulting 30x30 matrix is cached for the day, so the probability for any
+game, including games added to the slate later, is a constant-time lookup.
+
+Functions:
+- log5: Compute the probability that team A beats team B from their win percentages.
+- build_matchup_matrix: Compute the head-to-head win probability of every pair of teams.
+- get_matchup_matrix: Return the day's matchup matrix for a model, building it on first use.
+- get_matchup_probability: Look up the probability that a team beats an opponent.
+
+Imports:
+- Standard libraries: threading, weakref, datetime
+- External libraries: numpy, pandas, modules.constants
+"""
+
+import threading
+import weakref
+from datetime import date
+import numpy as np
+import pandas as pd
+from modules.constants import all_team_ids
+
+_matchup_cache = {}
+_matchup_cache_lock = threading.Lock()
+
+# Content hash of each live feature matrix, keyed by id() and dropped when the matrix is garbage collected
+_feature_matrix_versions = {}
+
+
+def log5(p_a, p_b):
+    """
+    Compute the probability that team A beats team B from their win percentages.
+
+    Args:
+    - p_a (float or ndarray): Win percentage of team A.
+    - p_b (float or ndarray): Win percentage of team B.
+
+    Returns:
+    - float or ndarray: Probability that team A beats team B.
+    """
+
+    return (p_a - p_a * p_b) / (p_a + p_b - 2 * p_a * p_b)
+
+
+def build_matchup_matrix(model, feature_matrix, team_ids=all_team_ids):
+    """
+    Compute the head-to-head win probability of every pair of teams.
+
+    Args:
+    - model (RandomForestRegressor): The trained model.
+    - feature_matrix (DataFrame): Team_ID-indexed feature matrix built by build_feature_matrix.
+    - team_ids (list): Team IDs the matrix should cover.
+
+    Returns:
+    - DataFrame: Probability that the row team beats the column team, indexed by Team_ID on both axes.
+      The diagonal and the rows and columns of teams without features are NaN.
+    """
+
+    team_rows = feature_matrix.reindex(team_ids).dropna()
+    win_pcts = pd.Series(np.nan, index=pd.Index(team_ids, name='Team_ID'))
+    if not team_rows.empty:
+        win_pcts.loc[team_rows.index] = model.predict(team_rows)
+
+    p = win_pcts.to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        probabilities = log5(p[:, np.newaxis], p[np.newaxis, :])
+    np.fill_diagonal(probabilities, np.nan)
+
+    return pd.DataFrame(probabilities, index=win_pcts.index, columns=win_pcts.index)
+
+
+def _feature_matrix_version(feature_matrix):
+    """Hash the contents of a feature matrix once per object, so later lookups only cost an id()."""
+    key = id(feature_matrix)
+    with _matchup_cache_lock:
+        entry = _feature_matrix_versions.get(key)
+    if entry is not None and entry[0]() is feature_matrix:
+        return entry[1]
+
+    version = int(pd.util.hash_pandas_object(feature_matrix).sum())
+    reference = weakref.ref(feature_matrix, lambda _: _feature_matrix_versions.pop(key, None))
+    with _matchup_cache_lock:
+        _feature_matrix_versions[key] = (reference, version)
+    return version
+
+
+def get_matchup_matrix(model, feature_matrix, game_date=None):
+    """
+    Return the day's matchup matrix for a model, building it on first use.
+
+    The matrix is cached per model fingerprint, feature matrix contents and date. The contents are hashed
+    the first time a feature matrix is seen, so feature matrices must not be modified in place afterwards.
+
+    Args:
+    - model (RandomForestRegressor): The trained model.
+    - feature_matrix (DataFrame): Team_ID-indexed feature matrix built by build_feature_matrix.
+    - game_date (date): The day the matrix is cached for. Defaults to today.
+
+    Returns:
+    - DataFrame: The matchup matrix built by build_matchup_matrix.
+    """
+
+    key = (getattr(model, 'fingerprint_', id(model)), _feature_matrix_version(feature_matrix),
+           game_date or date.today())
+
+    with _matchup_cache_lock:
+        matrix = _matchup_cache.get(key)
+    if matrix is None:
+        matrix = build_matchup_matrix(model, feature_matrix)
+        with _matchup_cache_lock:
+            # Drop the matrices of previous days
+            for cached_key in [cached_key for cached_key in _matchup_cache if cached_key[2] != key[2]]:
+                del _matchup_cache[cached_key]
+            _matchup_cache[key] = matrix
+
+    return matrix
+
+
+def get_matchup_probability(matchup_matrix, team_id, opponent_id):
+    """
+    Look up the probability that a team beats an opponent.
+
+    Args:
+    - matchup_matrix (DataFrame): Matrix built by build_matchup_matrix.
+    - team_id (int): ID of the team.
+    - opponent_id (int): ID of the opponent.
+
+    Returns:
+    - float: The probability, or None if either team is unknown or has no features.
+    """
+
+    try:
+        probability = matchup_matrix.at[team_id, opponent_id]
+    except KeyError:
+        return None
+    return None if pd.isna(probability) else float(probability)
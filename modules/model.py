@@ -5,34 +5,105 @@ model.py
 This module contains functions related to the training, testing, and application of the RandomForestRegressor model for MLB betting predictions.
 
 Functions:
-- train_and_test_model: Train the RandomForestRegressor model using grid search and test its performance.
-- parse_data: Parse the API data, make predictions using the trained model, and get recommendations for betting.
+- warm_start_update: Update the most recent model with trees grown on the new data instead of running a full search.
+- train_and_test_model: Train the RandomForestRegressor model using a hyperparameter search and test its performance.
+- parse_data: Make predictions for today's slate using the trained model and get recommendations for betting.
 
 Imports:
 - Standard libraries: datetime
-- External libraries: sklearn, eli5, modules.recommendation, modules.constants
+- External libraries: sklearn, modules.recommendation, modules.data_processing, modules.model_store, modules.search, modules.constants, modules.instrumentation
 """
 
-from datetime import datetime
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import GridSearchCV
+from datetime import date
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import eli5
-from eli5.sklearn import PermutationImportance
-from modules.recommendation import get_recommendation_for_game, format_output
-from modules.constants import features, param_grid
+from modules.recommendation import get_recommendations_for_slate, format_output
+from modules.data_processing import get_slate_games, get_game_key
+from modules.model_store import compute_fingerprint, load_model, save_model, mark_latest, load_latest_model
+from modules.search import run_search
+from modules.constants import features, param_grid, search_strategy, search_n_iter, search_time_budget_seconds, \
+    training_mode, warm_start_max_new_trees, retune_interval_days, drift_threshold
+from modules.instrumentation import timed
 
 
-def train_and_test_model(train_data, test_data):
+def warm_start_update(X_train, y_train, X_test, y_test, max_new_trees=warm_start_max_new_trees,
+                      retune_interval_days=retune_interval_days, drift_threshold=drift_threshold):
     """
-    Train the RandomForestRegressor model using grid search and test its performance.
+    Update the most recent model with trees grown on the new data instead of running a full search.
+
+    The previous model keeps its tuned hyperparameters. Its oldest trees, up to max_new_trees of them, are
+    dropped and the same number of trees is grown on the updated data using warm_start. A full search is
+    required instead when there is no previous model, the last search is older than retune_interval_days,
+    or the previous model's error on the current test data has drifted more than drift_threshold above
+    the error recorded by the last full search. Comparing against the search, rather than the previous
+    update, keeps small drifts from compounding across updates.
+
+    Args:
+    - X_train, X_test (DataFrame): Training and testing feature matrices.
+    - y_train, y_test (Series): Training and testing targets.
+    - max_new_trees (int): Maximum number of trees replaced in one update.
+    - retune_interval_days (int): Number of days after which a full search is required.
+    - drift_threshold (float): Allowed relative increase of the test MSE before a full search is required.
+
+    Returns:
+    - tuple: Contains the updated model, its parameters, the date of its last full search and the test MSE
+      recorded by that search, or None if a full search is required.
+    """
+
+    previous = load_latest_model()
+    if previous is None or previous.get('tuned_on') is None:
+        print("No previous model found, running a full search")
+        return None
+
+    if (date.today() - date.fromisoformat(previous['tuned_on'])).days >= retune_interval_days:
+        print(f"Last full search was on {previous['tuned_on']}, running a full search")
+        return None
+
+    model = previous['model']
+    if list(getattr(model, 'feature_names_in_', [])) != list(X_train.columns):
+        print("Features changed since the previous model, running a full search")
+        return None
+
+    # Models stored before tuned_mse was recorded fall back to their own test MSE
+    tuned_mse = previous['metrics'].get('tuned_mse', previous['metrics']['mse'])
+    current_mse = mean_squared_error(y_test, model.predict(X_test))
+    if current_mse > tuned_mse * (1 + drift_threshold):
+        print(f"Validation error drifted to {current_mse:.5f}, running a full search")
+        return None
+
+    # Replace the oldest trees with trees grown on the updated data
+    n_trees = min(max_new_trees, len(model.estimators_))
+    model.estimators_ = model.estimators_[n_trees:]
+    # A fresh seed keeps the new trees from repeating the seeds of the trees that were kept
+    model.set_params(warm_start=True, random_state=date.today().toordinal())
+    model.fit(X_train, y_train)
+    model.set_params(warm_start=False)
+    print(f"Replaced {n_trees} trees of the previous model")
+
+    return model, previous['params'], previous['tuned_on'], tuned_mse
+
+
+@timed()
+def train_and_test_model(train_data, test_data, use_store=True, strategy=search_strategy, n_iter=search_n_iter,
+                         time_budget=search_time_budget_seconds, mode=training_mode):
+    """
+    Train the RandomForestRegressor model using a hyperparameter search and test its performance.
+
+    If a model was already trained on identical data, features, parameter grid and search settings, it is loaded
+    from the model store instead of being retrained.
 
     Args:
     - train_data (DataFrame): Training data.
     - test_data (DataFrame): Testing data.
+    - use_store (bool): If True, reuse and persist models through the model store.
+    - strategy (str): Search strategy, one of 'grid', 'random' or 'halving'.
+    - n_iter (int): Number of candidates sampled by the 'random' strategy.
+    - time_budget (float): Wall-clock budget for the search in seconds. None means no limit.
+    - mode (str): 'full' to always run the search, or 'incremental' to update the previous model with
+      warm_start when no full search is due.
 
     Returns:
-    - tuple: Contains the trained model, MAE, MSE, R2, and test feature data.
+    - tuple: Contains the trained model, MAE, MSE, R2, and test feature data. The model's fingerprint_
+      attribute holds the fingerprint it is stored under.
     """
 
     # Convert the 'stand_W' and 'stand_L' columns to float type and then compute the Win-Loss Percentage (W-L%).
@@ -54,65 +125,84 @@ def train_and_test_model(train_data, test_data):
     X_test = test_data[features]
     y_test = test_data["W-L%"]
 
-    # Create the base model to tune
-    rf = RandomForestRegressor(random_state=42)
-
-    # Instantiate the grid search model
-    grid_search = GridSearchCV(estimator=rf, param_grid=param_grid,
-                               cv=3, n_jobs=-1, verbose=2, scoring='neg_mean_squared_error')
-
-    # Fit the grid search to the data
-    grid_search.fit(X_train, y_train)
-
-    # Get the best model
-    best_grid = grid_search.best_estimator_
+    # Reuse the stored model if the inputs have not changed since it was trained
+    # A budget-truncated search or a warm-started update can give a different model than a full search,
+    # so the budget and the training mode are part of the fingerprint
+    fingerprint = compute_fingerprint(
+        X_train, y_train, X_test, y_test, features, param_grid,
+        {'strategy': strategy, 'n_iter': n_iter, 'time_budget': time_budget, 'mode': mode})
+    if use_store:
+        artifact = load_model(fingerprint)
+        if artifact is not None:
+            print(f"Loaded stored model {fingerprint[:12]}")
+            mark_latest(fingerprint)
+            artifact['model'].fingerprint_ = fingerprint
+            metrics = artifact['metrics']
+            return artifact['model'], metrics['mae'], metrics['mse'], metrics['r2'], X_test
+
+    # Grow the previous model on the new data if possible, otherwise search the hyperparameters
+    update = None
+    if mode == 'incremental' and use_store:
+        update = warm_start_update(X_train, y_train, X_test, y_test)
+
+    if update is not None:
+        best_grid, best_params, tuned_on, tuned_mse = update
+        n_fits = 1
+    else:
+        best_grid, best_params, n_fits = run_search(
+            X_train, y_train, strategy, n_iter, time_budget)
+        tuned_on = date.today().isoformat()
 
     # Evaluate the best model
     y_pred = best_grid.predict(X_test)
     mae = mean_absolute_error(y_test, y_pred)
     mse = mean_squared_error(y_test, y_pred)
     r2 = r2_score(y_test, y_pred)
+    if update is None:
+        tuned_mse = mse
 
-    perm = PermutationImportance(best_grid, random_state=1).fit(X_test, y_test)
-    eli5.show_weights(perm, feature_names=X_test.columns.tolist())
+    # Permutation importance is computed by a separate, optional stage (see modules/importance.py)
+    best_grid.fingerprint_ = fingerprint
+
+    if use_store:
+        save_model(fingerprint, best_grid, best_params,
+                   {'mae': mae, 'mse': mse, 'r2': r2, 'n_fits': n_fits, 'tuned_mse': tuned_mse}, tuned_on)
+        mark_latest(fingerprint)
 
     return best_grid, mae, mse, r2, X_test
 
 
-def parse_data(api_data, model, train_data, team_to_id):
+@timed()
+def parse_data(slate, model, feature_matrix, team_to_id, game_date=None):
     """
-    Parse the API data, make predictions using the trained model, and get recommendations for betting.
+    Make predictions for today's slate using the trained model and get recommendations for betting.
 
     Args:
-    - api_data (list): Data fetched from the API.
+    - slate (dict): Slate index built by build_slate.
     - model (RandomForestRegressor): The trained model.
-    - train_data (DataFrame): Training data.
+    - feature_matrix (DataFrame): Team_ID-indexed feature matrix built by build_feature_matrix.
     - team_to_id (dict): Dictionary mapping team names to team IDs.
+    - game_date (date): Local date to make recommendations for. Defaults to today.
 
     Returns:
     - list: List of games with recommendations.
     """
 
-    current_date = datetime.utcnow().date()  # Get today's date in UTC
     games = []
+    slate_games = get_slate_games(slate, game_date)
+    recommendations = get_recommendations_for_slate(
+        slate_games, model, feature_matrix, team_to_id)
 
-    for game in api_data:
-        commence_time = datetime.strptime(
-            game['commence_time'], '%Y-%m-%dT%H:%M:%SZ')
-        commence_date_utc = commence_time.date()
-
-        if commence_date_utc != current_date:
-            continue
-
-        recommendation = get_recommendation_for_game(
-            game, model, train_data, team_to_id)
+    for game, recommendation in zip(slate_games, recommendations):
         if recommendation:
             print(format_output(recommendation))
 
             games.append({
+                'game_id': get_game_key(game),
                 'home_team': game['home_team'],
                 'away_team': game['away_team'],
                 'commence_time': game['commence_time'],
+                'start_time': game['start_time'],
                 'recommendation': recommendation,
             })
 
@@ -0,0 +1,140 @@
+"""
+model_store.py
+--------------
+
+This module persists trained models so that a run on unchanged data can skip training entirely.
+Each stored artifact holds the best estimator, the chosen hyperparameters and the evaluation metrics,
+and is keyed by a fingerprint of the training and testing data, the features list and the parameter grid.
+
+Functions:
+- compute_fingerprint: Hash the model inputs into a stable fingerprint.
+- load_model: Load a stored model artifact by fingerprint.
+- save_model: Atomically store a model artifact under its fingerprint.
+- mark_latest: Record a fingerprint as the most recently used model.
+- load_latest_model: Load the most recently used model artifact.
+
+Imports:
+- Standard libraries: os, json, hashlib
+- External libraries: joblib, pandas, modules.constants, modules.cache
+"""
+
+import os
+import json
+import hashlib
+import joblib
+import pandas as pd
+from modules.constants import model_store_dir
+from modules.cache import atomic_write
+
+
+def compute_fingerprint(X_train, y_train, X_test, y_test, features, param_grid, search_settings=None):
+    """
+    Hash the model inputs into a stable fingerprint.
+
+    Args:
+    - X_train, X_test (DataFrame): Training and testing feature matrices.
+    - y_train, y_test (Series): Training and testing targets.
+    - features (list): Feature names used by the model.
+    - param_grid (dict): Hyperparameter grid searched during training.
+    - search_settings (dict): Optional search settings, such as the strategy, that change the trained model.
+
+    Returns:
+    - str: Hex digest identifying the inputs.
+    """
+
+    digest = hashlib.sha256()
+    for data in (X_train, y_train, X_test, y_test):
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    digest.update(json.dumps(features).encode())
+    digest.update(json.dumps(param_grid, sort_keys=True, default=str).encode())
+    if search_settings:
+        digest.update(json.dumps(search_settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _artifact_path(fingerprint, directory):
+    """Build the path of the stored artifact for a fingerprint."""
+    return os.path.join(directory, f"{fingerprint}.joblib")
+
+
+def load_model(fingerprint, directory=model_store_dir):
+    """
+    Load a stored model artifact by fingerprint.
+
+    Args:
+    - fingerprint (str): Fingerprint returned by compute_fingerprint.
+    - directory (str): Directory holding the stored models.
+
+    Returns:
+    - dict: Artifact with 'model', 'params' and 'metrics' keys, or None if no model is stored.
+    """
+
+    path = _artifact_path(fingerprint, directory)
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def save_model(fingerprint, model, params, metrics, tuned_on=None, directory=model_store_dir):
+    """
+    Atomically store a model artifact under its fingerprint.
+
+    Args:
+    - fingerprint (str): Fingerprint returned by compute_fingerprint.
+    - model (RandomForestRegressor): The trained model.
+    - params (dict): Hyperparameters chosen by the search.
+    - metrics (dict): Evaluation metrics of the model.
+    - tuned_on (str): ISO date of the last full hyperparameter search the model descends from.
+    - directory (str): Directory holding the stored models.
+
+    Returns:
+    - str: Path of the stored artifact.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    path = _artifact_path(fingerprint, directory)
+    artifact = {'model': model, 'params': params, 'metrics': metrics, 'tuned_on': tuned_on}
+
+    atomic_write(path, lambda tmp_path: joblib.dump(artifact, tmp_path))
+    return path
+
+
+def mark_latest(fingerprint, directory=model_store_dir):
+    """
+    Record a fingerprint as the most recently used model.
+
+    Args:
+    - fingerprint (str): Fingerprint of a stored model.
+    - directory (str): Directory holding the stored models.
+
+    Returns:
+    - None
+    """
+
+    os.makedirs(directory, exist_ok=True)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint}, f)
+
+    atomic_write(os.path.join(directory, 'latest.json'), write)
+
+
+def load_latest_model(directory=model_store_dir):
+    """
+    Load the most recently used model artifact.
+
+    Args:
+    - directory (str): Directory holding the stored models.
+
+    Returns:
+    - dict: Artifact with 'model', 'params', 'metrics' and 'tuned_on' keys, or None if there is none.
+    """
+
+    path = os.path.join(directory, 'latest.json')
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        fingerprint = json.load(f)['fingerprint']
+    return load_model(fingerprint, directory)
@@ -0,0 +1,140 @@
+"""
+odds_api.py
+-----------
+
+This module provides a reusable HTTP client for The Odds API.
+The client keeps a pooled requests session alive between calls, retries rate-limited and server errors
+with jittered exponential backoff, and caches responses for a short window so repeated calls within a
+polling interval reuse the previous result instead of hitting the API again.
+
+Classes:
+- OddsApiClient: Pooled, retrying and caching client for The Odds API.
+
+Functions:
+- get_default_client: Return the shared OddsApiClient used by fetch_data_from_api.
+
+Imports:
+- Standard libraries: os, time, random
+- External libraries: requests, dotenv, modules.constants
+"""
+
+import os
+import time
+import random
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from modules.constants import odds_api_timeout, odds_api_max_retries, odds_api_backoff_seconds, \
+    odds_api_cache_seconds
+
+# Status codes that are worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OddsApiClient:
+    """
+    Pooled, retrying and caching client for The Odds API.
+
+    Args:
+    - url (str): The API link to fetch. Defaults to the API_LINK environment variable.
+    - timeout (tuple): Connect and read timeouts in seconds.
+    - max_retries (int): Number of retries on 429/5xx responses and connection errors.
+    - backoff_seconds (float): Base delay for the exponential backoff between retries.
+    - cache_seconds (float): How long a successful response is reused. 0 disables caching.
+    - pool_size (int): Number of connections kept alive in the session pool.
+    """
+
+    def __init__(self, url=None, timeout=odds_api_timeout, max_retries=odds_api_max_retries,
+                 backoff_seconds=odds_api_backoff_seconds, cache_seconds=odds_api_cache_seconds, pool_size=4):
+        if url is None:
+            load_dotenv()
+            url = os.getenv("API_LINK")
+
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache_seconds = cache_seconds
+        self._cache = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+    def _backoff(self, attempt, response=None):
+        """Sleep before the next retry, honouring a Retry-After header when the API sends one."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            # Cap the wait at the longest backoff, so a bad header cannot stall the run for hours
+            time.sleep(min(float(retry_after), self.backoff_seconds * (2 ** self.max_retries)))
+        else:
+            # Full jitter so that concurrent clients do not retry in lockstep
+            time.sleep(random.uniform(0, self.backoff_seconds * (2 ** attempt)))
+
+    def get(self, url=None, params=None):
+        """
+        Fetch JSON from the API, reusing a cached response if it is still fresh.
+
+        Args:
+        - url (str): URL to fetch. Defaults to the client's API link.
+        - params (dict): Optional query parameters.
+
+        Returns:
+        - Dictionary: JSON formatted data fetched from the API.
+        """
+
+        url = url or self.url
+        key = (url, tuple(sorted((params or {}).items())))
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise Exception(f"Failed to fetch data from API: {e}") from e
+                self._backoff(attempt)
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                self._backoff(attempt, response)
+                continue
+
+            if response.status_code != 200:
+                raise Exception(
+                    f"Failed to fetch data from API: HTTP {response.status_code} {response.reason}")
+
+            data = response.json()
+            if self.cache_seconds > 0:
+                self._cache[key] = (time.monotonic(), data)
+            return data
+
+    def clear_cache(self):
+        """Drop all cached responses so the next call goes to the API."""
+        self._cache.clear()
+
+    def close(self):
+        """Close the underlying session and its pooled connections."""
+        self.session.close()
+
+
+_default_client = None
+
+
+def get_default_client():
+    """
+    Return the shared OddsApiClient used by fetch_data_from_api.
+
+    Returns:
+    - OddsApiClient: The client, created on first use.
+    """
+
+    global _default_client
+    if _default_client is None:
+        _default_client = OddsApiClient()
+    return _default_client
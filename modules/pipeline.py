@@ -0,0 +1,133 @@
+"""
+pipeline.py
+-----------
+
+This module contains a small orchestrator that runs the stages of the MLB betting application as a
+dependency graph. Each stage starts as soon as the stages it depends on have finished, so independent I/O
+such as the Odds API call, the pybaseball scrapes and the logo downloads overlap.
+
+Stages run on worker threads under asyncio. CPU-bound stages run on a separate single-thread executor,
+so model training never blocks the event loop or takes the threads used for I/O.
+
+Classes:
+- Stage: A named step of the pipeline and the stages it depends on.
+
+Functions:
+- run_pipeline: Run the stages of a pipeline concurrently in dependency order.
+
+Imports:
+- Standard libraries: asyncio, concurrent.futures
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Stage:
+    """
+    A named step of the pipeline and the stages it depends on.
+
+    Args:
+    - name (str): Unique name of the stage.
+    - func (callable): Function called with a dictionary mapping each dependency name to its result.
+    - deps (tuple): Names of the stages that must finish first.
+    - cpu_bound (bool): If True, run the stage on the executor reserved for CPU-bound work.
+    """
+
+    def __init__(self, name, func, deps=(), cpu_bound=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.cpu_bound = cpu_bound
+
+
+def _check_graph(stages):
+    """Raise an exception if a dependency is unknown or the stages contain a cycle."""
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in names:
+                raise Exception(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+    remaining = {stage.name: set(stage.deps) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise Exception(f"Pipeline stages contain a cycle: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def _downstream(stages, name):
+    """Return the names of all stages that depend directly or indirectly on a stage."""
+    downstream = []
+    frontier = [name]
+    while frontier:
+        current = frontier.pop()
+        for stage in stages:
+            if current in stage.deps and stage.name not in downstream:
+                downstream.append(stage.name)
+                frontier.append(stage.name)
+    return downstream
+
+
+async def _run_stages(stages):
+    """Run the stages as asyncio tasks and collect their results and failures."""
+    loop = asyncio.get_running_loop()
+    cpu_executor = ThreadPoolExecutor(max_workers=1)
+    results = {}
+    failures = {}
+    tasks = {}
+
+    async def run_stage(stage):
+        for dep in stage.deps:
+            await tasks[dep]
+        if any(dep not in results for dep in stage.deps):
+            return
+
+        print(f"Running stage '{stage.name}'...")
+        inputs = {dep: results[dep] for dep in stage.deps}
+        executor = cpu_executor if stage.cpu_bound else None
+        try:
+            results[stage.name] = await loop.run_in_executor(executor, stage.func, inputs)
+        except Exception as e:
+            failures[stage.name] = e
+
+    try:
+        for stage in stages:
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+        await asyncio.gather(*tasks.values())
+    finally:
+        cpu_executor.shutdown(wait=False)
+
+    return results, failures
+
+
+def run_pipeline(stages):
+    """
+    Run the stages of a pipeline concurrently in dependency order.
+
+    A stage whose dependency failed is skipped. Each failure is printed along with the downstream stages it
+    caused to be skipped.
+
+    Args:
+    - stages (list): Stage objects making up the pipeline.
+
+    Returns:
+    - tuple: A dictionary mapping stage names to results, a dictionary mapping failed stage names to their
+      exceptions, and a list of skipped stage names.
+    """
+
+    _check_graph(stages)
+    results, failures = asyncio.run(_run_stages(stages))
+
+    skipped = [stage.name for stage in stages if stage.name not in results and stage.name not in failures]
+    for name, error in failures.items():
+        print(f"Stage '{name}' failed: {type(error).__name__}: {error}")
+        downstream = [stage for stage in _downstream(stages, name) if stage in skipped]
+        if downstream:
+            print(f"  Skipped downstream stages: {', '.join(downstream)}")
+
+    return results, failures, skipped
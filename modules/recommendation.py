@@ -7,15 +7,37 @@ This module contains functions related to generating betting recommendations bas
 Functions:
 - expected_value: Calculate the expected value of a bet.
 - get_best_odds_for_team: Find the best odds for a given team across multiple bookmakers.
+- decimal_odds: Convert American odds to decimal odds.
+- get_best_lines: Find the best line for every outcome of every game in the odds table.
+- recommendation_cache_key: Build a stable key identifying a game's quotes and the model pricing them.
+- get_recommendation_cache_stats: Return the hit and miss counts of the recommendation cache.
+- clear_recommendation_cache: Discard the cached recommendations and reset the counters.
 - get_recommendation_for_game: Generate recommendation for a single game.
+- get_recommendations_for_slate: Generate recommendations for every game on a slate from the head-to-head matchup matrix.
 - format_output: Format the recommendation for better terminal output.
 
+Variables:
+- recommendation_cache_stats: Hit, miss and eviction counts of the recommendation cache.
+
 Imports:
-- External libraries: modules.data_processing, modules.constants
+- Standard libraries: json, hashlib, threading, collections
+- External libraries: pandas, modules.data_processing, modules.matchups, modules.constants
 """
 
-from modules.data_processing import fetch_team_features
-from modules.constants import features
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+from modules.data_processing import get_game_key, build_odds_table
+from modules.matchups import get_matchup_matrix, get_matchup_probability
+from modules.constants import recommendation_cache_size
+
+# LRU cache of recommendations keyed by recommendation_cache_key, and its counters
+_recommendation_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_MISS = object()
+recommendation_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
 
 
 def expected_value(odds, predicted_win_pct):
@@ -40,6 +62,8 @@ def get_best_odds_for_team(team_name, bookmakers):
     """
     Find the best odds for a given team across multiple bookmakers.
 
+    Odds are compared by their decimal payout, so positive and negative American prices are ranked correctly.
+
     Args:
     - team_name (str): Name of the team.
     - bookmakers (list): List of bookmakers and their odds.
@@ -56,66 +80,222 @@ def get_best_odds_for_team(team_name, bookmakers):
             if market["key"] == "h2h":
                 for outcome in market["outcomes"]:
                     if outcome["name"] == team_name:
-                        if best_odds is None or (outcome["price"] > 0 and outcome["price"] > best_odds) or (outcome["price"] < 0 and abs(outcome["price"]) < abs(best_odds)):
+                        if best_odds is None or decimal_odds(outcome["price"]) > decimal_odds(best_odds):
                             best_odds = outcome["price"]
                             best_bookmaker = bookmaker["title"]
 
     return best_odds, best_bookmaker
 
 
-def get_recommendation_for_game(game, model, train_data, team_to_id):
+def decimal_odds(odds):
+    """
+    Convert American odds to decimal odds.
+
+    Args:
+    - odds (float): American odds.
+
+    Returns:
+    - float: Decimal odds, i.e. the total payout per unit staked.
+    """
+
+    return 1 + odds / 100 if odds > 0 else 1 + 100 / abs(odds)
+
+
+def get_best_lines(odds_table, market="h2h"):
+    """
+    Find the best line for every outcome of every game in the odds table.
+
+    Args:
+    - odds_table (DataFrame): Quotes table built by build_odds_table.
+    - market (str): Market to consider.
+
+    Returns:
+    - DataFrame: One row per game and outcome with the best price, its bookmaker, decimal price and implied probability.
+    """
+
+    quotes = odds_table[odds_table['market'] == market]
+    best_index = quotes.groupby(['game_id', 'outcome'], sort=False)['decimal_price'].idxmax()
+    return quotes.loc[best_index, ['game_id', 'outcome', 'bookmaker', 'price', 'decimal_price', 'implied_prob']] \
+        .reset_index(drop=True)
+
+
+def recommendation_cache_key(game, model):
+    """
+    Build a stable key identifying a game's quotes and the model pricing them.
+
+    Only the quoted prices are hashed, so fields such as the bookmakers' update times do not cause misses.
+
+    Args:
+    - game (dict): Information about the game, with its bookmaker quotes.
+    - model (RandomForestRegressor): The trained model.
+
+    Returns:
+    - str: SHA-256 hex digest, or None if the model has no fingerprint and cannot be cached.
+    """
+
+    fingerprint = getattr(model, 'fingerprint_', None)
+    if fingerprint is None:
+        return None
+
+    quotes = sorted(
+        (bookmaker['title'], market['key'], outcome['name'], outcome['price'])
+        for bookmaker in game.get('bookmakers', [])
+        for market in bookmaker['markets']
+        for outcome in market['outcomes']
+    )
+    payload = json.dumps([get_game_key(game), game['home_team'], game['away_team'], quotes, fingerprint])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cache_lookup(cache_key):
+    """Return the cached recommendation for a key, or _MISS, and count the hit or miss."""
+    if cache_key is None:
+        return _MISS
+    with _cache_lock:
+        if cache_key in _recommendation_cache:
+            _recommendation_cache.move_to_end(cache_key)
+            recommendation_cache_stats['hits'] += 1
+            recommendation = _recommendation_cache[cache_key]
+            return dict(recommendation) if recommendation else recommendation
+        recommendation_cache_stats['misses'] += 1
+        return _MISS
+
+
+def _cache_store(cache_key, recommendation):
+    """Store a recommendation, evicting the least recently used entries beyond the cache size."""
+    if cache_key is None:
+        return
+    with _cache_lock:
+        _recommendation_cache[cache_key] = dict(recommendation) if recommendation else recommendation
+        _recommendation_cache.move_to_end(cache_key)
+        while len(_recommendation_cache) > recommendation_cache_size:
+            _recommendation_cache.popitem(last=False)
+            recommendation_cache_stats['evictions'] += 1
+
+
+def get_recommendation_cache_stats():
+    """
+    Return the hit and miss counts of the recommendation cache.
+
+    Returns:
+    - dict: Hits, misses, evictions, current size and hit rate of the cache.
+    """
+
+    with _cache_lock:
+        stats = dict(recommendation_cache_stats, size=len(_recommendation_cache))
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+    return stats
+
+
+def clear_recommendation_cache():
+    """Discard the cached recommendations and reset the counters."""
+    with _cache_lock:
+        _recommendation_cache.clear()
+        for counter in recommendation_cache_stats:
+            recommendation_cache_stats[counter] = 0
+
+
+def get_recommendation_for_game(game, model, feature_matrix, team_to_id):
     """
     Generate recommendation for a single game.
 
+    The game is priced as a slate of one, so it goes through the same recommendation cache as
+    get_recommendations_for_slate.
+
     Args:
     - game (dict): Information about the game.
     - model (RandomForestRegressor): The trained model.
-    - train_data (DataFrame): Training data.
+    - feature_matrix (DataFrame): Team_ID-indexed feature matrix built by build_feature_matrix.
     - team_to_id (dict): Dictionary mapping team names to team IDs.
 
     Returns:
-    - dict: Contains the recommendation details.
+    - dict: Contains the recommendation details, or None if the game cannot be predicted or has no quote
+      for the picked team.
     """
 
-    home_team_name = game['home_team']
-    away_team_name = game['away_team']
+    return get_recommendations_for_slate([game], model, feature_matrix, team_to_id)[0]
 
-    home_team_id = team_to_id.get(home_team_name, None)
-    away_team_id = team_to_id.get(away_team_name, None)
 
-    if home_team_id is None or away_team_id is None:
-        return None
+def get_recommendations_for_slate(games, model, feature_matrix, team_to_id, odds_table=None, matchup_matrix=None):
+    """
+    Generate recommendations for every game on a slate from the head-to-head matchup matrix.
 
-    home_team_features = fetch_team_features(home_team_id, train_data)
-    away_team_features = fetch_team_features(away_team_id, train_data)
+    The win probability of each game is looked up in the 30x30 matchup matrix, which is computed in one
+    batch for all teams and cached for the day. Best prices and expected values are then computed for all
+    games at once from the columnar odds table.
 
-    if home_team_features.empty or away_team_features.empty:
-        return None
+    Args:
+    - games (list): Games on the slate.
+    - model (RandomForestRegressor): The trained model.
+    - feature_matrix (DataFrame): Team_ID-indexed feature matrix built by build_feature_matrix.
+    - team_to_id (dict): Dictionary mapping team names to team IDs.
+    - odds_table (DataFrame): Quotes table built by build_odds_table. Built from games if not given.
+    - matchup_matrix (DataFrame): Matrix built by build_matchup_matrix. Taken from the day's cache if not given.
 
-    home_team_predicted_win_pct = model.predict(
-        home_team_features[features])[0]
-    away_team_predicted_win_pct = model.predict(
-        away_team_features[features])[0]
+    Returns:
+    - list: Recommendation for each game, in the same order as games. None for games that cannot be predicted.
+      Games whose quotes are unchanged since they were last priced by the same model are served from the
+      recommendation cache.
+    """
 
-    if home_team_predicted_win_pct > away_team_predicted_win_pct:
-        recommended_team = home_team_name
-        predicted_win_pct = home_team_predicted_win_pct
-    else:
-        recommended_team = away_team_name
-        predicted_win_pct = away_team_predicted_win_pct
-
-    best_odds, best_bookmaker = get_best_odds_for_team(
-        recommended_team, game['bookmakers'])
-    ev = expected_value(best_odds, predicted_win_pct)
-
-    return {
-        "team": recommended_team,
-        "price": best_odds,
-        "bookmaker": best_bookmaker,
-        "predicted_win_pct": predicted_win_pct,
-        "expected_profit": predicted_win_pct * best_odds,
-        "expected_value": ev
-    }
+    # Reuse the recommendations of games whose quotes have not changed for this model
+    recommendations = [None] * len(games)
+    cache_keys = [recommendation_cache_key(game, model) for game in games]
+    pending = []
+    for position, cache_key in enumerate(cache_keys):
+        cached = _cache_lookup(cache_key)
+        if cached is _MISS:
+            pending.append(position)
+        else:
+            recommendations[position] = cached
+
+    if not pending:
+        return recommendations
+
+    if matchup_matrix is None:
+        matchup_matrix = get_matchup_matrix(model, feature_matrix)
+
+    # Pick the team more likely to win each game
+    picks = []
+    for position in pending:
+        game = games[position]
+        home_team_win_prob = get_matchup_probability(
+            matchup_matrix, team_to_id.get(game['home_team']), team_to_id.get(game['away_team']))
+
+        if home_team_win_prob is None:
+            continue
+
+        if home_team_win_prob > 0.5:
+            picks.append((position, get_game_key(game), game['home_team'], home_team_win_prob))
+        else:
+            picks.append((position, get_game_key(game), game['away_team'], 1 - home_team_win_prob))
+
+    if picks:
+        if odds_table is None:
+            odds_table = build_odds_table([games[position] for position in pending])
+
+        # Join the picks with the best line for the picked team and price them in one pass
+        picks = pd.DataFrame(picks, columns=['position', 'game_id', 'outcome', 'predicted_win_pct'])
+        picks = picks.merge(get_best_lines(odds_table), on=['game_id', 'outcome'], how='inner')
+        picks['expected_value'] = (picks['decimal_price'] - 1) * picks['predicted_win_pct'] \
+            - (1 - picks['predicted_win_pct'])
+        picks['expected_profit'] = picks['predicted_win_pct'] * picks['price']
+
+        for pick in picks.itertuples(index=False):
+            recommendations[pick.position] = {
+                "team": pick.outcome,
+                "price": int(pick.price),
+                "bookmaker": pick.bookmaker,
+                "predicted_win_pct": float(pick.predicted_win_pct),
+                "expected_profit": float(pick.expected_profit),
+                "expected_value": float(pick.expected_value)
+            }
+
+    for position in pending:
+        _cache_store(cache_keys[position], recommendations[position])
+
+    return recommendations
 
 
 def format_output(recommendation):
@@ -0,0 +1,132 @@
+"""
+search.py
+---------
+
+This module contains the hyperparameter search used to tune the RandomForestRegressor model.
+The search can run exhaustively over the parameter grid, sample a fixed number of candidates at random,
+or run successive halving over n_estimators, and it can be capped by a wall-clock budget.
+
+Candidates are evaluated in parallel batches with GridSearchCV. A batch is only started if the previous batch's
+duration suggests it will finish within the budget, and the best candidate found so far is then refit on the
+full training data. The budget is a soft cap: the first batch always runs so that there is a model to return,
+and a batch that is already running is not interrupted, so a search can overrun by up to one batch.
+
+Functions:
+- run_search: Tune a RandomForestRegressor with the selected search strategy.
+
+Imports:
+- Standard libraries: os, time, math
+- External libraries: sklearn, modules.constants
+"""
+
+import os
+import time
+import math
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import GridSearchCV, ParameterGrid, ParameterSampler
+from modules.constants import param_grid
+
+search_strategies = ('grid', 'random', 'halving')
+
+
+def _evaluate_candidates(estimator, candidates, X, y, cv, deadline):
+    """
+    Cross-validate candidates in parallel batches until they are exhausted or the deadline passes.
+
+    Args:
+    - estimator (RandomForestRegressor): Base estimator to tune.
+    - candidates (list): Parameter dictionaries to evaluate.
+    - X (DataFrame): Training features.
+    - y (Series): Training target.
+    - cv (int): Number of cross-validation folds.
+    - deadline (float): time.monotonic() value by which the search should finish, or None. A batch is not
+      started if the previous batch's duration says it would end after the deadline.
+
+    Returns:
+    - tuple: List of (score, params) pairs for the evaluated candidates, and the number of fits run.
+    """
+
+    batch_size = os.cpu_count() or 1
+    results = []
+    fits = 0
+    batch_seconds = 0
+
+    for start in range(0, len(candidates), batch_size):
+        if deadline is not None and results and time.monotonic() + batch_seconds >= deadline:
+            break
+
+        batch_start = time.monotonic()
+        batch = candidates[start:start + batch_size]
+        search = GridSearchCV(estimator=estimator, param_grid=[{k: [v] for k, v in params.items()} for params in batch],
+                              cv=cv, n_jobs=-1, scoring='neg_mean_squared_error', refit=False)
+        search.fit(X, y)
+
+        results.extend(zip(search.cv_results_['mean_test_score'], search.cv_results_['params']))
+        fits += len(batch) * cv
+        batch_seconds = time.monotonic() - batch_start
+
+    return results, fits
+
+
+def run_search(X, y, strategy='grid', n_iter=50, time_budget=None, cv=3, halving_factor=3):
+    """
+    Tune a RandomForestRegressor with the selected search strategy.
+
+    Args:
+    - X (DataFrame): Training features.
+    - y (Series): Training target.
+    - strategy (str): 'grid' for the full parameter grid, 'random' for n_iter sampled candidates,
+      or 'halving' for successive halving over the n_estimators values in the grid.
+    - n_iter (int): Number of candidates sampled by the 'random' strategy.
+    - time_budget (float): Soft wall-clock budget in seconds, see the module notes. None means no limit.
+    - cv (int): Number of cross-validation folds.
+    - halving_factor (int): Fraction of candidates kept between halving rounds is 1 / halving_factor.
+
+    Returns:
+    - tuple: Contains the best model refit on all data, its parameters, and the number of fits run.
+    """
+
+    if strategy not in search_strategies:
+        raise ValueError(
+            f"Unknown search strategy '{strategy}', expected one of {search_strategies}")
+
+    start = time.monotonic()
+    deadline = start + time_budget if time_budget is not None else None
+    rf = RandomForestRegressor(random_state=42)
+
+    if strategy == 'grid':
+        results, fits = _evaluate_candidates(
+            rf, list(ParameterGrid(param_grid)), X, y, cv, deadline)
+    elif strategy == 'random':
+        candidates = list(ParameterSampler(param_grid, n_iter=n_iter, random_state=42))
+        results, fits = _evaluate_candidates(rf, candidates, X, y, cv, deadline)
+    else:
+        # Successive halving: evaluate every candidate with few trees, keep the best fraction and give it more trees
+        resources = sorted(param_grid['n_estimators'])
+        base_grid = {k: v for k, v in param_grid.items() if k != 'n_estimators'}
+        candidates = list(ParameterGrid(base_grid))
+        fits = 0
+        for n_estimators in resources:
+            round_candidates = [{**params, 'n_estimators': n_estimators} for params in candidates]
+            round_results, round_fits = _evaluate_candidates(
+                rf, round_candidates, X, y, cv, deadline)
+            fits += round_fits
+            if not round_results:
+                break
+
+            results = round_results
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+            results.sort(key=lambda result: result[0], reverse=True)
+            keep = max(1, math.ceil(len(results) / halving_factor))
+            candidates = [{k: v for k, v in params.items() if k != 'n_estimators'}
+                          for _, params in results[:keep]]
+
+    best_score, best_params = max(results, key=lambda result: result[0])
+    best_model = clone(rf).set_params(**best_params).fit(X, y)
+    fits += 1
+
+    print(f"{strategy.capitalize()} search ran {fits} fits in {time.monotonic() - start:.1f}s")
+    return best_model, best_params, fits
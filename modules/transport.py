@@ -0,0 +1,197 @@
+"""
+transport.py
+------------
+
+This module contains the delivery transports used to send the betting recommendation email.
+A transport is created once and reused, so sending to several recipients or sending repeatedly from a
+long-running process does not re-authenticate or reconnect for every message.
+
+Classes:
+- EmailTransport: Base class for email delivery transports.
+- GmailTransport: Send messages through the Gmail API, caching the credentials and the service object.
+- SmtpTransport: Send messages over SMTP, for example to a local debugging server.
+
+Functions:
+- get_credentials: Load and refresh the Google OAuth2 credentials.
+- get_transport: Return the shared transport selected by the EMAIL_TRANSPORT environment variable.
+
+Notes:
+- For offline testing, run a local debugging server such as `python -m aiosmtpd -n -l localhost:1025`
+  and set EMAIL_TRANSPORT=smtp.
+
+Imports:
+- Standard libraries: os, abc, base64, smtplib
+- External libraries: googleapiclient, google_auth_oauthlib, google.oauth2, dotenv
+"""
+
+import os
+import base64
+from abc import ABC, abstractmethod
+import smtplib
+from dotenv import load_dotenv
+from googleapiclient.discovery import build
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
+
+
+def get_credentials():
+    """
+    Load and refresh the Google OAuth2 credentials.
+
+    Args:
+    - None
+
+    Returns:
+    - creds (Credentials): Loaded or refreshed Google OAuth2 credentials.
+    """
+
+    creds = None
+    if os.path.exists("data/token.json"):
+        creds = Credentials.from_authorized_user_file("data/token.json")
+
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                "data/credentials.json", [
+                    "https://www.googleapis.com/auth/gmail.send"]
+            )
+            creds = flow.run_local_server(port=0)
+        with open("data/token.json", "w") as token:
+            token.write(creds.to_json())
+
+    return creds
+
+
+class EmailTransport(ABC):
+    """
+    Base class for email delivery transports.
+
+    Subclasses implement send, and close if they hold a connection.
+    """
+
+    @abstractmethod
+    def send(self, msg):
+        """
+        Send a message.
+
+        Args:
+        - msg (Message): The email message, with its recipients set in the 'To' header.
+
+        Returns:
+        - str: Identifier of the sent message.
+        """
+
+    def close(self):
+        """Release any connection held by the transport."""
+
+
+class GmailTransport(EmailTransport):
+    """
+    Send messages through the Gmail API, caching the credentials and the service object.
+
+    The credentials are only reloaded when they have expired, and the discovery service is built once.
+    """
+
+    def __init__(self):
+        self._creds = None
+        self._service = None
+
+    def _get_service(self):
+        """Return the cached Gmail service, refreshing the credentials first if they have expired."""
+        if self._creds is None or not self._creds.valid:
+            self._creds = get_credentials()
+            self._service = None
+
+        if self._service is None:
+            self._service = build('gmail', 'v1', credentials=self._creds, cache_discovery=False)
+
+        return self._service
+
+    def send(self, msg):
+        create_message = {'raw': base64.urlsafe_b64encode(msg.as_bytes()).decode()}
+        send_message = (self._get_service().users().messages().send(
+            userId="me", body=create_message).execute())
+        return send_message["id"]
+
+
+class SmtpTransport(EmailTransport):
+    """
+    Send messages over SMTP, for example to a local debugging server.
+
+    Args:
+    - host (str): SMTP server host.
+    - port (int): SMTP server port.
+    - username (str): Optional username to log in with.
+    - password (str): Optional password to log in with.
+    - use_tls (bool): If True, upgrade the connection with STARTTLS.
+    """
+
+    def __init__(self, host="localhost", port=1025, username=None, password=None, use_tls=False):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self._connection = None
+
+    def _connect(self):
+        """Return the open SMTP connection, reconnecting if the server dropped it."""
+        if self._connection is not None:
+            try:
+                if self._connection.noop()[0] == 250:
+                    return self._connection
+            except (smtplib.SMTPException, OSError):
+                # A dropped socket raises OSError rather than an SMTP error
+                pass
+
+        self._connection = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            self._connection.starttls()
+        if self.username:
+            self._connection.login(self.username, self.password)
+        return self._connection
+
+    def send(self, msg):
+        self._connect().send_message(msg)
+        return msg.get("Message-ID", "")
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+
+_transport = None
+
+
+def get_transport():
+    """
+    Return the shared transport selected by the EMAIL_TRANSPORT environment variable.
+
+    EMAIL_TRANSPORT is 'gmail' (the default) or 'smtp'. The SMTP transport reads SMTP_HOST, SMTP_PORT,
+    SMTP_USERNAME, SMTP_PASSWORD and SMTP_TLS.
+
+    Returns:
+    - EmailTransport: The transport, created on first use.
+    """
+
+    global _transport
+    if _transport is None:
+        load_dotenv()
+        if os.getenv("EMAIL_TRANSPORT", "gmail").lower() == "smtp":
+            _transport = SmtpTransport(
+                host=os.getenv("SMTP_HOST", "localhost"),
+                port=int(os.getenv("SMTP_PORT", "1025")),
+                username=os.getenv("SMTP_USERNAME"),
+                password=os.getenv("SMTP_PASSWORD"),
+                use_tls=os.getenv("SMTP_TLS") == "1",
+            )
+        else:
+            _transport = GmailTransport()
+    return _transport
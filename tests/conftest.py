@@ -0,0 +1,55 @@
+"""
+conftest.py
+-----------
+
+Shared builders for the tests: games in the format returned by The Odds API, and the recommendations made
+for them. The make_game and make_pick fixtures return the builders.
+"""
+
+import pytest
+
+COMMENCE_TIME = '2024-05-01T23:00:00Z'
+
+
+def build_game(game_id, home_team='Home', away_team='Away', quotes=None, commence_time=COMMENCE_TIME,
+               recommendation=None):
+    """
+    Build a game in the format returned by The Odds API.
+
+    Args:
+    - game_id (str): The Odds API game ID.
+    - home_team, away_team (str): Team names.
+    - quotes (dict): Mapping of bookmaker titles to mappings of team names to h2h American odds.
+    - commence_time (str): UTC start time in The Odds API format.
+    - recommendation (dict): Optional recommendation, as attached to the games returned by parse_data.
+
+    Returns:
+    - dict: The game.
+    """
+
+    return {
+        'id': game_id,
+        'commence_time': commence_time,
+        'home_team': home_team,
+        'away_team': away_team,
+        'bookmakers': [{'title': title, 'markets': [{'key': 'h2h', 'outcomes': [
+            {'name': team, 'price': price} for team, price in prices.items()]}]}
+            for title, prices in (quotes or {}).items()],
+        'recommendation': recommendation,
+    }
+
+
+def build_pick(team='Home', price=120, expected_value=0.05, bookmaker='FanDuel', predicted_win_pct=0.55):
+    """Build a recommendation in the format returned by get_recommendations_for_slate."""
+    return {'team': team, 'price': price, 'bookmaker': bookmaker, 'predicted_win_pct': predicted_win_pct,
+            'expected_value': expected_value}
+
+
+@pytest.fixture
+def make_game():
+    return build_game
+
+
+@pytest.fixture
+def make_pick():
+    return build_pick
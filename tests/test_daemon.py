@@ -0,0 +1,59 @@
+"""
+test_daemon.py
+--------------
+
+Checks which odds changes make the daemon re-price a game, and which recommendation moves make it send the
+email again.
+"""
+
+from modules.daemon import diff_snapshots, is_material_change
+from modules.data_processing import build_odds_table
+
+
+def test_diff_snapshots_ignores_unchanged_games(make_game):
+    games = [make_game('g1', quotes={'FanDuel': {'Home': 120, 'Away': -140}})]
+
+    assert diff_snapshots(build_odds_table(games), build_odds_table(games)) == set()
+
+
+def test_diff_snapshots_finds_new_changed_and_withdrawn_quotes(make_game):
+    previous = build_odds_table([
+        make_game('unchanged', quotes={'FanDuel': {'Home': 120, 'Away': -140}}),
+        make_game('changed', quotes={'FanDuel': {'Home': 120, 'Away': -140}}),
+        make_game('withdrawn', quotes={'FanDuel': {'Home': 120, 'Away': -140},
+                                       'DraftKings': {'Home': 115, 'Away': -135}}),
+        make_game('removed', quotes={'FanDuel': {'Home': 120, 'Away': -140}}),
+    ])
+    current = build_odds_table([
+        make_game('unchanged', quotes={'FanDuel': {'Home': 120, 'Away': -140}}),
+        make_game('changed', quotes={'FanDuel': {'Home': 125, 'Away': -145}}),
+        make_game('withdrawn', quotes={'FanDuel': {'Home': 120, 'Away': -140}}),
+        make_game('new', quotes={'FanDuel': {'Home': -110, 'Away': -110}}),
+    ])
+
+    assert diff_snapshots(previous, current) == {'changed', 'withdrawn', 'removed', 'new'}
+
+
+def test_material_change_when_pick_appears_disappears_or_switches(make_pick):
+    assert not is_material_change(None, None)
+    assert is_material_change(None, make_pick())
+    assert is_material_change(make_pick(), None)
+    assert is_material_change(make_pick('Home'), make_pick('Away'))
+
+
+def test_material_change_price_threshold(make_pick):
+    # +120 is 2.20 in decimal odds, +124 is 2.24 and +130 is 2.30
+    assert not is_material_change(make_pick(price=120), make_pick(price=124), price_threshold=0.05, ev_threshold=1)
+    assert is_material_change(make_pick(price=120), make_pick(price=130), price_threshold=0.05, ev_threshold=1)
+    # Prices are compared in decimal odds, so moving from -105 to +105 is a small move
+    assert not is_material_change(make_pick(price=-105), make_pick(price=105), price_threshold=0.1, ev_threshold=1)
+
+
+def test_material_change_expected_value_threshold(make_pick):
+    def changed(previous_ev, current_ev):
+        return is_material_change(make_pick(expected_value=previous_ev), make_pick(expected_value=current_ev),
+                                  price_threshold=1, ev_threshold=0.02)
+
+    assert not changed(0.05, 0.06)
+    assert changed(0.05, 0.08)
+    assert changed(0.05, 0.02)
@@ -0,0 +1,94 @@
+"""
+test_history.py
+---------------
+
+Round trips through a temporary history database: recommendations, odds snapshots and results are recorded,
+then read back through the final_recommendations view by get_performance and get_closing_line_value.
+"""
+
+from datetime import date, datetime, timezone
+import pytest
+from modules.history import record_recommendations, record_odds_snapshot, record_results, get_performance, \
+    get_closing_line_value
+
+
+def _utc(text):
+    """Parse a UTC timestamp in The Odds API format."""
+    return datetime.strptime(text, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def history(tmp_path, make_game, make_pick):
+    """
+    Record two games in a temporary database.
+
+    Game g1 is won by the pick, whose final price is +110 against a closing line of +100. A pick made after
+    the game started is ignored. Game g2 is lost at -150 and has no odds snapshots.
+    """
+
+    path = str(tmp_path / 'history.sqlite')
+
+    def g1(**kwargs):
+        return make_game('g1', 'Home A', 'Away B', commence_time='2024-05-01T23:00:00Z', **kwargs)
+
+    def g2(**kwargs):
+        return make_game('g2', 'Home C', 'Away D', commence_time='2024-05-02T23:05:00Z', **kwargs)
+
+    record_recommendations([g1(recommendation=make_pick('Home A', 120))],
+                           run_at=_utc('2024-05-01T15:00:00Z'), path=path)
+    record_recommendations([g1(recommendation=make_pick('Home A', 110)), g2(recommendation=make_pick('Home C', -150))],
+                           run_at=_utc('2024-05-01T20:00:00Z'), path=path)
+    record_recommendations([g1(recommendation=make_pick('Away B', 300))],
+                           run_at=_utc('2024-05-01T23:30:00Z'), path=path)
+
+    for fetched_at, price in (('2024-05-01T12:00:00Z', 120), ('2024-05-01T22:00:00Z', 100),
+                              ('2024-05-01T23:30:00Z', -110)):
+        record_odds_snapshot([g1(quotes={'FanDuel': {'Home A': price, 'Away B': -120}})],
+                             fetched_at=_utc(fetched_at), path=path)
+
+    record_results([{'game_id': 'g1', 'game_date': date(2024, 5, 1), 'winner': 'Home A'},
+                    {'game_id': 'g2', 'game_date': date(2024, 5, 2), 'winner': 'Away D'}], path=path)
+    return path
+
+
+def test_performance_counts_final_pick_before_start(history):
+    totals, = get_performance(path=history)
+
+    assert totals['bets'] == 2
+    assert totals['wins'] == 1
+    assert totals['hit_rate'] == pytest.approx(0.5)
+    # +110 pays 1.1 units on the win, the -150 loss costs 1 unit
+    assert totals['profit'] == pytest.approx(0.1)
+    assert totals['roi'] == pytest.approx(0.05)
+
+
+def test_performance_by_team_and_date_range(history):
+    by_team = {row['group']: row for row in get_performance(group_by='team', path=history)}
+    assert by_team['Home A']['profit'] == pytest.approx(1.1)
+    assert by_team['Home C']['profit'] == pytest.approx(-1.0)
+    assert 'Away B' not in by_team
+
+    second_day, = get_performance(start_date=date(2024, 5, 2), path=history)
+    assert second_day['bets'] == 1
+    assert second_day['wins'] == 0
+
+
+def test_performance_rejects_unknown_grouping(history):
+    with pytest.raises(Exception):
+        get_performance(group_by='model_fingerprint', path=history)
+
+
+def test_closing_line_value_uses_last_snapshot_before_start(history):
+    clv = get_closing_line_value(path=history)
+
+    # Only g1 has a closing line: the final +110 pick (2.10) against the +100 close (2.00)
+    assert clv['bets'] == 1
+    assert clv['clv'] == pytest.approx(0.05)
+    assert clv['beat_close_rate'] == pytest.approx(1.0)
+
+
+def test_empty_history(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+
+    assert get_performance(path=path) == []
+    assert get_closing_line_value(path=path) == {'bets': 0, 'clv': None, 'beat_close_rate': None}
@@ -0,0 +1,133 @@
+"""
+test_recommendation_cache.py
+----------------------------
+
+Checks the LRU cache of per-game recommendations used by get_recommendations_for_slate: hits and misses,
+eviction at recommendation_cache_size, and the counters reported by get_recommendation_cache_stats.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import modules.recommendation as recommendation
+from modules.recommendation import get_recommendations_for_slate, get_recommendation_for_game, \
+    get_recommendation_cache_stats, clear_recommendation_cache
+from modules.constants import team_to_id, all_team_ids
+
+HOME_TEAM, AWAY_TEAM = list(team_to_id)[:2]
+
+
+class _Model:
+    """Stand-in for the trained model that predicts a fixed win percentage per team."""
+
+    def __init__(self, fingerprint):
+        self.fingerprint_ = fingerprint
+
+    def predict(self, rows):
+        return 0.4 + rows.index.to_numpy() / 100
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_recommendation_cache()
+    yield
+    clear_recommendation_cache()
+
+
+@pytest.fixture
+def feature_matrix():
+    return pd.DataFrame(np.ones((len(all_team_ids), 1)), index=pd.Index(all_team_ids, name='Team_ID'),
+                        columns=['feature'])
+
+
+@pytest.fixture
+def game(make_game):
+    """Return a builder of games between the first two teams, quoted by FanDuel unless quoted is False."""
+    def build(game_id, home_price=120, quoted=True):
+        quotes = {'FanDuel': {HOME_TEAM: home_price, AWAY_TEAM: -140}} if quoted else None
+        return make_game(game_id, HOME_TEAM, AWAY_TEAM, quotes)
+    return build
+
+
+def _price(games, model, feature_matrix):
+    """Price a slate of games."""
+    return get_recommendations_for_slate(games, model, feature_matrix, team_to_id)
+
+
+def test_hits_and_misses(feature_matrix, game):
+    model = _Model('a')
+    first, = _price([game('g1')], model, feature_matrix)
+    second, = _price([game('g1')], model, feature_matrix)
+
+    assert first is not None
+    assert second == first
+    stats = get_recommendation_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 1, 1)
+    assert stats['hit_rate'] == pytest.approx(0.5)
+
+
+def test_changed_quotes_or_model_miss(feature_matrix, game):
+    _price([game('g1')], _Model('a'), feature_matrix)
+    _price([game('g1', home_price=130)], _Model('a'), feature_matrix)
+    _price([game('g1')], _Model('b'), feature_matrix)
+
+    stats = get_recommendation_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (0, 3, 3)
+
+
+def test_evicts_least_recently_used_beyond_size(feature_matrix, game, monkeypatch):
+    monkeypatch.setattr(recommendation, 'recommendation_cache_size', 3)
+    model = _Model('a')
+
+    _price([game('g1'), game('g2'), game('g3')], model, feature_matrix)
+    # Using g1 again makes g2 the least recently used entry
+    _price([game('g1')], model, feature_matrix)
+    _price([game('g4'), game('g5')], model, feature_matrix)
+
+    stats = get_recommendation_cache_stats()
+    assert stats['evictions'] == 2
+    assert stats['size'] == 3
+
+    _price([game('g1'), game('g2')], model, feature_matrix)
+    stats = get_recommendation_cache_stats()
+    assert (stats['hits'], stats['misses']) == (2, 6)
+
+
+def test_game_without_quotes_is_cached_as_no_recommendation(feature_matrix, game):
+    model = _Model('a')
+    games = [game('g1'), game('g2', quoted=False)]
+
+    priced, unquoted = _price(games, model, feature_matrix)
+    assert priced is not None
+    assert unquoted is None
+
+    assert _price(games, model, feature_matrix) == [priced, None]
+    stats = get_recommendation_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (2, 2, 2)
+
+
+def test_single_game_matches_the_slate(feature_matrix, game):
+    model = _Model('a')
+    slate = _price([game('g1'), game('g2', quoted=False)], model, feature_matrix)
+    clear_recommendation_cache()
+
+    assert get_recommendation_for_game(game('g1'), model, feature_matrix, team_to_id) == slate[0]
+    assert get_recommendation_for_game(game('g2', quoted=False), model, feature_matrix, team_to_id) is None
+
+
+def test_models_without_fingerprint_are_not_cached(feature_matrix, game):
+    model = _Model(None)
+    _price([game('g1')], model, feature_matrix)
+    _price([game('g1')], model, feature_matrix)
+
+    stats = get_recommendation_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (0, 0, 0)
+    assert stats['hit_rate'] is None
+
+
+def test_clear_resets_counters(feature_matrix, game):
+    _price([game('g1')], _Model('a'), feature_matrix)
+    clear_recommendation_cache()
+
+    assert get_recommendation_cache_stats() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0,
+                                                'hit_rate': None}